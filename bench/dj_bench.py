@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Damgård–Jurik throughput per plaintext byte.
+
+Usage: dj_bench.py <bits> <iterations> [s ...]
+
+For each s (default 1 2 3 4), encrypts and decrypts <iterations> random plaintexts of the
+full size n^s under one Paillier key of <bits> bits.  s = 1 is Paillier.
+Output:     CSV with a header: s, plaintext and ciphertext bytes, expansion, and the mean
+            microseconds per plaintext byte for encryption and decryption.
+            Key generation is excluded.
+"""
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import paillier
+import random
+random.seed(20260506)
+
+def per_op(fn, args):
+    t0 = time.perf_counter_ns()
+    out = [fn(*a) for a in args]
+    t1 = time.perf_counter_ns()
+    return (t1 - t0) / 1000.0 / len(args), out
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__, file=sys.stderr); sys.exit(2)
+    bits, n = int(sys.argv[1]), int(sys.argv[2])
+    ss = [int(a) for a in sys.argv[3:]] or [1, 2, 3, 4]
+
+    (prv, pub) = paillier.generate_keys(bits, False)
+    key = paillier.PaillierPrivateKey.from_tuple(prv)
+    print("s,plain_bytes,cipher_bytes,expansion,encrypt_us_per_byte,decrypt_us_per_byte")
+    for s in ss:
+        ms = [random.randrange(pub[0]**s) for _ in range(n)]
+        plain  = (pub[0]**s).bit_length() // 8
+        cipher = (pub[0]**(s + 1)).bit_length() // 8
+        (enc, cs) = per_op(paillier.dj_encrypt, [(m, pub, s) for m in ms])
+        (dec, ts) = per_op(paillier.dj_decrypt, [(c, key, s) for c in cs])
+        if ts != ms:
+            print("decryption mismatch", file=sys.stderr); sys.exit(1)
+        print(f"{s},{plain},{cipher},{cipher / plain:.3f},{enc / plain:.3f},{dec / plain:.3f}")
+
+if __name__ == "__main__":
+    main()
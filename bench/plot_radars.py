@@ -15,6 +15,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
 OUT  = os.environ.get("BENCH_OUT", "/tmp/bench_data")
+# Python rows carry the power_mod engine they were timed with; chart one of them.
+# Rows without a mode (Julia, and results from before engines were selectable) always count.
+PY_MODE = os.environ.get("PY_MODE", "sliding")
 RESULTS = os.path.join(OUT, "results.csv")
 OUT_DIR = os.path.join(OUT, "charts")
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -33,6 +36,8 @@ def load():
     by_cell = defaultdict(lambda: defaultdict(dict))
     with open(RESULTS) as f:
         for r in csv.DictReader(f):
+            if r.get("mode") not in (None, "", PY_MODE):
+                continue
             try: mean = float(r["mean_us"]); ci_p = float(r["ci_perc"])
             except: mean, ci_p = float("nan"), float("nan")
             cell = (r["operation"], int(r["bits"]))
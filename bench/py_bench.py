@@ -2,10 +2,11 @@
 """
 Per-iteration timing driver for the Python cryptosystems.
 
-Usage: py_bench.py <algorithm> <op> <bits> <iterations>
+Usage: py_bench.py <algorithm> <op> <bits> <iterations> [mode]
 
 Algorithms: rsa, elgamal, rabin, paillier, ss, cocks
 Ops:        keygen, encrypt, decrypt
+Modes:      the power_mod engine (primes.POWER_MODES); default primes.power_mode
 Output:     one duration in microseconds per line on stdout, no header.
             Times the *operation only* — key generation cost is excluded
             from encrypt/decrypt timings (key is generated once and reused).
@@ -69,9 +70,11 @@ def time_op(fn):
     return (t1 - t0) / 1000.0, v
 
 def main():
-    if len(sys.argv) != 5:
+    if len(sys.argv) not in (5, 6):
         print(__doc__, file=sys.stderr); sys.exit(2)
     alg, op, bits, n = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+    if len(sys.argv) == 6 and sys.argv[5]:
+        primes.set_power_mode(sys.argv[5])
     a = ALGOS[alg]
     msg = primes.encode("benchmark")
 
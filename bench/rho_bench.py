@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Pollard rho timing driver.
+
+Usage: rho_bench.py <bits> <count> [engine ...]
+
+Splits the same <count> random semiprimes of <bits> bits (two primes of bits/2 bits) with each
+engine (default: every engine in factor.RHO_ENGINES).
+Output:     CSV with a header: engine, bits, count, mean microseconds per semiprime, and the
+            mean iterations and gcds per semiprime from factor.counts.
+"""
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import primes, factor
+import random
+random.seed(20260506)
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__, file=sys.stderr); sys.exit(2)
+    bits, count = int(sys.argv[1]), int(sys.argv[2])
+    engines = sys.argv[3:] or list(factor.RHO_ENGINES)
+    half = bits // 2
+    ns = [p * q for (p, q) in (primes.prime_pair(2**(half - 1), 2**half - 1) for _ in range(count))]
+
+    print("engine,bits,count,us_per_n,iterations_per_n,gcds_per_n")
+    for engine in engines:
+        factor.reset_counts()
+        t0 = time.perf_counter_ns()
+        for n in ns:
+            r = factor.rho(n, engine)
+            if not 1 < r < n or n % r:
+                print(f"{engine}: bad factor {r} of {n}", file=sys.stderr); sys.exit(1)
+        t1 = time.perf_counter_ns()
+        c = factor.reset_counts()
+        print(f"{engine},{bits},{count},{(t1 - t0) / 1000.0 / count:.3f},"
+              f"{c['iterations'] / count:.1f},{c['gcds'] / count:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Batch RSA decryption timing driver.
+
+Usage: rsa_batch_bench.py <bits> <batch> <iterations> [mode]
+
+Decrypts <batch> ciphertexts, one under each of <batch> sibling keys that share a modulus.
+Modes:      batch   — rsa.BatchDecryptor (one full-size exponentiation per batch)
+            single  — rsa.decrypt per ciphertext with its own dᵢ
+            crt     — RSAPrivateKey.decrypt per ciphertext with its own dᵢ
+            default batch
+Output:     one duration in microseconds per batch per line on stdout, no header.
+            Key generation and table set-up are excluded.
+"""
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import rsa
+import random
+random.seed(20260506)
+
+def main():
+    if len(sys.argv) not in (4, 5):
+        print(__doc__, file=sys.stderr); sys.exit(2)
+    bits, batch, n = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+    mode = sys.argv[4] if len(sys.argv) == 5 and sys.argv[4] else "batch"
+
+    (key, siblings) = rsa.generate_batch_keys(bits, batch, False)
+    ms = [random.randrange(2, key.n) for _ in siblings]
+    cs = [rsa.encrypt(m, e, key.n) for (m, (e, _)) in zip(ms, siblings)]
+
+    if mode == "batch":
+        decryptor = rsa.BatchDecryptor(key, [e for (e, _) in siblings])
+        op = lambda: decryptor.decrypt(cs)
+    elif mode == "single":
+        op = lambda: [rsa.decrypt(c, d, key.n) for (c, (_, d)) in zip(cs, siblings)]
+    elif mode == "crt":
+        keys = [rsa.RSAPrivateKey(e, d, key.n, key.p, key.q) for (e, d) in siblings]
+        op = lambda: [k.decrypt(c) for (k, c) in zip(keys, cs)]
+    else:
+        print(f"Unknown mode: {mode}", file=sys.stderr); sys.exit(2)
+
+    if op() != ms:
+        print("decryption mismatch", file=sys.stderr); sys.exit(1)
+    for _ in range(n):
+        t0 = time.perf_counter_ns()
+        op()
+        t1 = time.perf_counter_ns()
+        print(f"{(t1 - t0) / 1000.0:.3f}")
+
+if __name__ == "__main__":
+    main()
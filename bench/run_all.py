@@ -9,7 +9,11 @@ multiple samples per round, automatically detects warmup, drops it, and
 reports a converged mean ± CI.
 
 Output: $BENCH_OUT/results.csv (default /tmp/bench_data/results.csv) with columns
-   lang,algorithm,operation,bits,iters_per_round,mean_us,ci_us,ci_perc,session_s
+   lang,algorithm,operation,bits,iters_per_round,mean_us,ci_us,ci_perc,session_s,mode
+
+Python is timed once for each power_mod engine named in $PY_MODES (comma
+separated, default "sliding"; see primes.POWER_MODES) and each engine is
+reported on its own rows. Julia rows have an empty mode.
 
 Set PILOT_BENCH to override the path to the bench binary; set BENCH_OUT to
 choose the output directory. Both default to ../pilot-bench/build/cli/bench
@@ -29,6 +33,8 @@ OUT   = os.environ.get("BENCH_OUT", "/tmp/bench_data")
 PILOT_OUT = os.path.join(OUT, "pilot_runs")
 os.makedirs(PILOT_OUT, exist_ok=True)
 
+PY_MODES = os.environ.get("PY_MODES", "sliding").split(",")
+
 ALGOS = ["rsa", "elgamal", "rabin", "paillier", "ss", "cocks"]
 OPS   = ["keygen", "encrypt", "decrypt"]
 BITS  = [512, 1024, 2048]
@@ -50,12 +56,12 @@ def session_limit(op, bits):
         return {512: 30, 1024: 60, 2048: 120}[bits]
     return {512: 30, 1024: 30, 2048: 60}[bits]
 
-def run_pilot(lang, alg, op, bits, k, sess_limit):
+def run_pilot(lang, alg, op, bits, k, sess_limit, mode=""):
     if lang == "python":
-        prog = ["python3", PY, alg, op, str(bits), str(k)]
+        prog = ["python3", PY, alg, op, str(bits), str(k), mode]
     else:
         prog = ["julia", "--startup-file=no", JL, alg, op, str(bits), str(k)]
-    out_dir = os.path.join(PILOT_OUT, f"{lang}_{alg}_{op}_{bits}")
+    out_dir = os.path.join(PILOT_OUT, f"{lang}_{alg}_{op}_{bits}" + (f"_{mode}" if mode else ""))
     cmd = [BENCH, "run_program",
            "--pi", "lat,us,0,0,1",
            "--ci-perc", "10",
@@ -80,31 +86,32 @@ def parse_pilot_csv(text):
 
 def main():
     rows = []
-    total = len(ALGOS) * len(OPS) * len(BITS) * 2
+    runs = [("python", mode) for mode in PY_MODES] + [("julia", "")]
+    total = len(ALGOS) * len(OPS) * len(BITS) * len(runs)
     i = 0
     t_start = time.time()
-    for lang in ("python", "julia"):
+    for lang, mode in runs:
         for alg in ALGOS:
             for op in OPS:
                 for bits in BITS:
                     i += 1
                     k = k_iters(op, bits)
                     sl = session_limit(op, bits)
-                    label = f"{lang}/{alg}/{op}/{bits}"
-                    print(f"[{i:3d}/{total}] {label:36s} k={k:>4} sl={sl:>3}s ", end="", flush=True)
+                    label = f"{lang}/{alg}/{op}/{bits}" + (f"/{mode}" if mode else "")
+                    print(f"[{i:3d}/{total}] {label:44s} k={k:>4} sl={sl:>3}s ", end="", flush=True)
                     t0 = time.time()
                     try:
-                        p = run_pilot(lang, alg, op, bits, k, sl)
+                        p = run_pilot(lang, alg, op, bits, k, sl, mode)
                     except subprocess.TimeoutExpired:
                         print(f"TIMEOUT")
-                        rows.append([lang, alg, op, bits, k, "nan", "nan", "nan", "nan"])
+                        rows.append([lang, alg, op, bits, k, "nan", "nan", "nan", "nan", mode])
                         continue
                     parsed = parse_pilot_csv(p.stdout)
                     elapsed = time.time() - t0
                     if not parsed:
                         # pilot may have failed (rc 13 = session limit reached but data exists; print stderr)
                         print(f"NO DATA  rc={p.returncode}  stderr={p.stderr[:80]}")
-                        rows.append([lang, alg, op, bits, k, "nan", "nan", "nan", f"{elapsed:.1f}"])
+                        rows.append([lang, alg, op, bits, k, "nan", "nan", "nan", f"{elapsed:.1f}", mode])
                         continue
                     try:
                         mean = float(parsed.get("readings_mean_formatted", "nan"))
@@ -115,13 +122,13 @@ def main():
                     ci_pct = (100.0 * ci / mean) if (mean and mean == mean and mean > 0) else float("nan")
                     print(f"mean={mean:9.2f}us  ±{ci_pct:5.1f}%  sess={sess:5.1f}s  wall={elapsed:5.1f}s")
                     rows.append([lang, alg, op, bits, k,
-                                 f"{mean:.4f}", f"{ci:.4f}", f"{ci_pct:.2f}", f"{sess:.2f}"])
+                                 f"{mean:.4f}", f"{ci:.4f}", f"{ci_pct:.2f}", f"{sess:.2f}", mode])
 
     out_csv = os.path.join(OUT, "results.csv")
     with open(out_csv, "w", newline="") as f:
         w = csv.writer(f)
         w.writerow(["lang", "algorithm", "operation", "bits", "k_per_round",
-                    "mean_us", "ci_us", "ci_perc", "session_s"])
+                    "mean_us", "ci_us", "ci_perc", "session_s", "mode"])
         w.writerows(rows)
     print(f"\nTotal wall: {time.time() - t_start:.1f}s. Wrote {out_csv}")
 
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# BSD 2-Clause License
+#
+# Copyright (c) 2021, Darrell Long
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Bulk encryption and decryption on a pool of processes.
+
+Each scheme's encrypt and decrypt take one integer at a time, and under the GIL one process
+uses one core.  stream(f, args, items) computes f(x, *args) for every x in items on a pool of
+worker processes and yields the results in the order of the items.
+
+A pool is made for one (f, args) and kept: its workers receive the key material once, when they
+start, and after that only chunks of integers and their results cross between processes.  The
+last few pools stay alive so that repeated calls under the same key do not pay the start-up
+again, and a pool is only shut down once no stream is still using it.  No more than two chunks
+per worker are outstanding at any time and results are yielded as they are ready, so inputs of
+any length run in bounded memory.
+"""
+
+import os, random, atexit
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+KEPT = 4 # How many pools to keep alive.
+
+_pools = OrderedDict() # (f, args, workers) -> ProcessPoolExecutor, most recently used last.
+
+_f    = None # The operation and the key material of this worker process.
+_args = None
+
+def _init_worker(f, args):
+    global _f, _args
+    (_f, _args) = (f, args)
+    random.seed() # A forked worker inherits its parent's generator: draw fresh nonces.
+
+def _run_chunk(chunk):
+    """
+    Worker: apply the operation to each item of chunk.
+    """
+    return [_f(x, *_args) for x in chunk]
+
+_users = {} # tag -> how many live streams are submitting to its pool.
+
+def pool(f, args, workers):
+    """
+    The pool of workers processes that run f(x, *args), started if it is not already alive.
+    The caller holds it until release(f, args, workers), and a held pool is never evicted.
+    """
+    tag = (f, args, workers)
+    _users[tag] = _users.get(tag, 0) + 1
+    if tag in _pools:
+        _pools.move_to_end(tag)
+    else:
+        _pools[tag] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(),
+                                          initializer=_init_worker, initargs=(f, args))
+    executor = _pools[tag]
+    trim()
+    return executor
+
+def release(f, args, workers):
+    """
+    Give back a pool obtained from pool(f, args, workers).
+    """
+    tag = (f, args, workers)
+    _users[tag] -= 1
+    if _users[tag] == 0:
+        del _users[tag]
+    trim()
+
+def trim():
+    """
+    Shut down the least recently used pools that no stream holds until at most KEPT remain.
+    While more than KEPT are held, all of them stay alive.
+    """
+    for tag in [t for t in _pools if t not in _users]:
+        if len(_pools) <= KEPT:
+            break
+        _pools.pop(tag).shutdown(wait=False, cancel_futures=True)
+
+@atexit.register
+def shutdown():
+    """
+    Stop every pool that is being kept.
+    """
+    while _pools:
+        (_, old) = _pools.popitem()
+        old.shutdown(wait=True, cancel_futures=True)
+
+def chunks(items, size):
+    """
+    Generate the items in lists of size (the last may be shorter).
+    """
+    chunk = []
+    for x in items:
+        chunk.append(x)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stream(f, args, items, workers=None, chunk=64):
+    """
+    Generate f(x, *args) for each x in the iterable items, in order.  workers defaults to the
+    number of processors; with one worker everything runs here, without a pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for x in items:
+            yield f(x, *args)
+        return
+    executor = pool(f, args, workers)
+    running  = deque()
+    try:
+        for c in chunks(items, chunk):
+            running.append(executor.submit(_run_chunk, c))
+            if len(running) >= 2 * workers:
+                yield from running.popleft().result()
+        while running:
+            yield from running.popleft().result()
+    finally: # Finished, failed or closed early: drop what is still queued and let the pool go.
+        for future in running:
+            future.cancel()
+        release(f, args, workers)
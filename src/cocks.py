@@ -31,7 +31,7 @@ import primes
 
 from random import randrange as uniform
 
-def generate_keys(nBits, safe=True):
+def generate_keys(nBits, safe=True, workers=1):
     """
     Generate a Cocks key pair whose modulus n = p*q has nBits of strength.
 
@@ -43,6 +43,7 @@ def generate_keys(nBits, safe=True):
     We enforce p < q so that q is the unambiguous "private prime" stored in the
     serialized key.  The inversion π = p⁻¹ mod (q-1) must exist; if it does not
     (i.e. gcd(p, q-1) > 1) we pick a fresh q and retry — this happens rarely.
+    With workers > 1, p and q are searched for at the same time by a pool of processes.
 
     Public key:  n
     Private key: (π, q)
@@ -51,17 +52,14 @@ def generate_keys(nBits, safe=True):
     low  = 2**(size - 1) # Assure the primes are each approximately half of the
     high = 2**size - 1   # bits in the modulus.
     f = primes.safe_prime if safe else primes.random_prime
-    p = f(low, high)
-    q = f(low, high)
-    while p == q:
-        q = f(low, high)
+    (p, q) = primes.prime_pair(low, high, safe, workers=workers)
     if p > q:
         p, q = q, p   # enforce p < q so q is unambiguously the stored private prime
     π = primes.inverse(p, q - 1)
     while π is None:  # retry if p is not invertible mod q – 1 (gcd(p, q-1) ≠ 1)
-        q = f(low, high)
+        q = f(low, high, workers=workers)
         while p == q:
-            q = f(low, high)
+            q = f(low, high, workers=workers)
         if p > q:
             p, q = q, p
         π = primes.inverse(p, q - 1)
@@ -89,6 +87,28 @@ def decrypt(c, key):
     (π, q) = key
     return primes.power_mod(c, π, q)
 
+def encryptor(n):
+    """
+    The key-bound Cocks encryptor for n: its pow(m) is encrypt(m, n), from a sliding-window
+    recoding of n made on first use and shared by every later encryption under n.
+    """
+    return primes.fixed_exponent(n, n)
+
+import bulk
+
+def encrypt_many(ms, n, workers=None, chunk=64):
+    """
+    m^n mod n for every m in the iterable ms, in order (see bulk.stream): Cocks encryption with
+    the recoding of n made once per worker by primes.fixed_power.
+    """
+    return bulk.stream(primes.fixed_power, (n, n), ms, workers, chunk)
+
+def decrypt_many(cs, key, workers=None, chunk=64):
+    """
+    The Cocks plaintexts c^π mod q for every c in the iterable cs, in order (see bulk.stream).
+    """
+    return bulk.stream(decrypt, (key,), cs, workers, chunk)
+
 import crypto_io as _io
 
 # ── Serialization ─────────────────────────────────────────────────────────────
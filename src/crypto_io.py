@@ -296,3 +296,15 @@ def xml_unwrap(root, field_names, xml):
     if inner:
         return None
     return result
+
+# ── Private-key readers ───────────────────────────────────────────────────────
+
+def key_reader(reader):
+    """
+    A classmethod that reads a key with reader and builds it by cls.from_tuple, to which any
+    further arguments are passed.  The readers return None on bad input, and so does it.
+    """
+    def read(cls, data, *args):
+        key = reader(data)
+        return None if key is None else cls.from_tuple(key, *args)
+    return classmethod(read)
@@ -31,7 +31,7 @@ import primes
 
 from random import randrange as uniform
 
-def generate_keys(k, safe=True):
+def generate_keys(k, safe=True, workers=1):
     """
     Generate an ElGamal key pair whose prime modulus p has k bits of strength.
 
@@ -43,7 +43,7 @@ def generate_keys(k, safe=True):
     The generator r is bounded below by 2¹⁶ + 1 to avoid degenerate small generators
     that expose group structure.  The secret exponent a is drawn from the upper half
     of [0, p-1] so it is large enough to resist baby-step / giant-step attacks sized
-    for small exponents.
+    for small exponents.  With workers > 1 the prime is searched for by a pool of processes.
 
     Public key:  (p, r, b)  where b = rᵃ mod p
     Private key: (p, a)
@@ -51,7 +51,7 @@ def generate_keys(k, safe=True):
     low  = 2**(k - 1)
     high = 2**k - 1
     f = primes.safe_prime if safe else primes.random_prime
-    p = f(low, high)
+    p = f(low, high, workers=workers)
     r = primes.group_generator(2**16 + 1, p)
     a = uniform((p - 1) // 2, p - 1)
     b = primes.power_mod(r, a, p)
@@ -72,6 +72,64 @@ def encrypt(m, key):
     𝛿 = (m * primes.power_mod(b, k, p)) % p
     return (𝛾, 𝛿)
 
+class Encryptor:
+    """
+    Encryption under one public key (p, r, b) from fixed-base tables for r and b.
+
+    r and b never change for the lifetime of a key, so their powers r^(2^(wi)) and b^(2^(wi))
+    are computed once (see primes.FixedBase).  After that each of γ = r^k and the mask b^k
+    takes about lg(p)/w multiplications and no squarings, several times cheaper than two
+    calls to power_mod.  Building the tables costs less than one exponentiation.
+    """
+    def __init__(self, key):
+        (self.p, r, b) = key
+        bits   = self.p.bit_length()
+        self.r = primes.FixedBase(r, self.p, bits)
+        self.b = primes.FixedBase(b, self.p, bits)
+
+    def encrypt(self, m):
+        """
+        Encrypt m exactly as encrypt(m, key) does.
+        """
+        k = uniform(1, self.p - 2)
+        return (self.r.pow(k), (m * self.b.pow(k)) % self.p)
+
+from functools import lru_cache
+
+@lru_cache(maxsize=16)
+def encryptor(key):
+    """
+    The Encryptor for the public key (p, r, b), built on first use and kept for the next.
+    """
+    return Encryptor(key)
+
+import precompute
+
+class PooledEncryptor(precompute.PooledEncryptor):
+    """
+    Offline/online encryption under one public key (p, r, b).
+
+    Neither γ = r^k nor the mask b^k depends on the message, so pairs (γ, b^k) are computed
+    ahead of time, with the fixed-base tables of encryptor(key), into a precompute.PrecomputePool
+    kept between low and high pairs by a background thread.  Online, an encryption takes one
+    pair out of the pool, never to be used again, and does a single multiplication.
+    """
+    def __init__(self, key, low=64, high=256):
+        self.p = key[0]
+        self.tables = encryptor(key)
+        super().__init__(self._pair, low, high)
+
+    def _pair(self):
+        k = uniform(1, self.p - 2)
+        return (self.tables.r.pow(k), self.tables.b.pow(k))
+
+    def encrypt(self, m):
+        """
+        Encrypt m as encrypt(m, key) does, with a precomputed pair.
+        """
+        (𝛾, mask) = self.pool.take()
+        return (𝛾, (m * mask) % self.p)
+
 def decrypt(m, key):
     """
     Decrypt by stripping the mask: δ · γ^(p−1−a) ≡ m (mod p).
@@ -84,6 +142,25 @@ def decrypt(m, key):
     𝛾, 𝛿 = m
     return (primes.power_mod(𝛾, p - 1 - a, p) * 𝛿) % p
 
+import bulk
+
+def _encrypt_fixed(m, key):
+    return encryptor(key).encrypt(m) # Each worker builds the tables once.
+
+def encrypt_many(ms, key, workers=None, chunk=64):
+    """
+    ElGamal pairs for every m in the iterable ms, in order (see bulk.stream).  Each worker builds
+    the fixed-base tables of encryptor(key) once and draws its own random exponents.
+    """
+    return bulk.stream(_encrypt_fixed, (key,), ms, workers, chunk)
+
+def decrypt_many(cs, key, workers=None, chunk=64):
+    """
+    The plaintexts of the ElGamal pairs in the iterable cs, in order, on workers that hold the
+    private exponent (see bulk.stream).
+    """
+    return bulk.stream(decrypt, (key,), cs, workers, chunk)
+
 import crypto_io as _io
 
 # ── Serialization ─────────────────────────────────────────────────────────────
@@ -32,14 +32,30 @@ from primes import gcd as gcd
 
 from random import randrange as uniform
 
-from functools import reduce
+from functools import reduce, lru_cache
+from itertools import compress
+from math      import isqrt
+
+import primes, time
 
 def f(x, b, n): return (b + x + x*x) % n
 
-def rho(n):
+counts = {"iterations": 0, "gcds": 0} # Steps of the sequence and gcds taken by rho, in all.
+
+def reset_counts():
+    """
+    Set the counts to zero and return what they were.
+    """
+    old = dict(counts)
+    counts.update(iterations=0, gcds=0)
+    return old
+
+def rho_floyd(n, deadline=None):
     """
     Compute Pollard's rho to find a nontrivial factor of n.
     Reinitialize parameters and retry if the computed factor equals n.
+    Floyd's tortoise and hare: three steps of f and a gcd for every step of the tortoise.
+    Gives up, returning None, once time.monotonic() passes deadline.
     """
     factor = n  # Initialize with the trivial factor
     while factor == n:
@@ -53,28 +69,377 @@ def rho(n):
             slow = f(slow, b, n)
             fast = f(f(fast, b, n), b, n)
             factor = gcd(slow - fast, n)
+            counts["iterations"] += 3
+            counts["gcds"] += 1
+            if deadline and counts["gcds"] % 1024 == 0 and time.monotonic() > deadline:
+                return None
 
     return factor
 
-def factor(n):
-    if n == 1 or is_prime(n):
-        return [n]
-    else:
-        f = []
-        q = [n]
-        while len(q) > 0:
-            x = q.pop()
-            r = rho(x)
-            y = x // r
-            if is_prime(r):
-                f.append(r)
-            elif r > 1:
-                q.append(r)
-            if is_prime(y):
-                f.append(y)
-            elif y > 1:
-                q.append(y)
-        return f
+def rho_brent(n, m=100, deadline=None):
+    """
+    Pollard's rho with Brent's cycle detection and batched gcds.
+
+    x is held at the positions 2ⁱ while y runs on through the next 2ⁱ steps, so each step of
+    the sequence is one evaluation of f rather than three.  Rather than gcd(x - y, n) after
+    every step, the differences are multiplied together mod n over blocks of m steps and one
+    gcd is taken per block: a factor of n that divides any of them divides the product.  If
+    the product collapses to n (several factors found in one block, or a multiple of n),
+    the block is walked again from its start one gcd at a time.  If even that gives n, the
+    sequence is restarted with a new constant.  Gives up, returning None, once
+    time.monotonic() passes deadline, but not before using a block that found a factor.
+    """
+    if n % 2 == 0:
+        return 2
+    while True:
+        b = uniform(1, max(2, n - 2))
+        y = uniform(0, max(2, n))
+        (g, r, q) = (1, 1, 1)
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + y + b) % n
+            counts["iterations"] += r
+            k = 0
+            while k < r and g == 1:
+                start = y
+                steps = min(m, r - k)
+                for _ in range(steps):
+                    y = (y * y + y + b) % n
+                    q = (q * (x - y)) % n
+                counts["iterations"] += steps
+                g = gcd(q, n)
+                counts["gcds"] += 1
+                k += m
+                if g == 1 and deadline and time.monotonic() > deadline:
+                    return None
+            r *= 2
+        if g == n: # Backtrack over the last block.
+            g = 1
+            while g == 1:
+                start = (start * start + start + b) % n
+                g = gcd(x - start, n)
+                counts["iterations"] += 1
+                counts["gcds"] += 1
+        if g != n:
+            return g
+
+RHO_ENGINES = {"brent": rho_brent, "floyd": rho_floyd}
+
+rho_engine = "brent"
+
+def rho(n, engine=None, deadline=None):
+    """
+    A nontrivial factor of the composite n by Pollard's rho, with the given cycle-finding
+    engine, or rho_engine if none is given; None if deadline passes first.
+    """
+    return RHO_ENGINES[engine or rho_engine](n, deadline=deadline)
+
+# ── Staged factoring ──────────────────────────────────────────────────────────
+#
+# factor_stages passes each composite through the stages in turn: trial division, perfect
+# powers, Pollard rho (cheap, for factors up to about 40 bits), Pollard p - 1, and Lenstra's
+# elliptic curve method.  The first stage to
+# split it hands the pieces back, and each piece goes through the pipeline again from the
+# perfect-power stage (trial division has already taken out every small prime).  Each stage has
+# a budget in seconds for the whole run; a stage whose budget is spent is skipped.
+
+TRIAL_PRIMES = primes.small_primes(10000)
+
+def trial_stage(n, deadline=None):
+    """
+    Divide out the primes of TRIAL_PRIMES.  Returns the primes found, with repetition, and the
+    cofactor if it is not 1; None if there are none.
+    """
+    found = []
+    for (i, p) in enumerate(TRIAL_PRIMES):
+        if p * p > n or (deadline and i % 256 == 0 and time.monotonic() > deadline):
+            break
+        while n % p == 0:
+            found.append(p)
+            n //= p
+    if not found:
+        return None
+    return found + [n] if n > 1 else found
+
+def power_stage(n, deadline=None):
+    """
+    n = aᵇ as b copies of a, or None if n is not a perfect power.
+    """
+    (a, b) = primes.perfect_power(n)
+    return None if a is None else [a] * b
+
+@lru_cache(maxsize=8)
+def primes_to(B):
+    """
+    The primes p ⩽ B, kept for the next call with the same bound.
+    """
+    return tuple(primes.small_primes(B + 1))
+
+def prime_segment(lo, hi):
+    """
+    Flags for lo, lo + 1, ..., hi - 1: 1 at the primes.  Sieved by the primes up to √hi, so
+    the memory is that of the segment however large hi is.
+    """
+    segment = bytearray([1]) * (hi - lo)
+    for p in primes_to(isqrt(hi - 1)):
+        start = max(p * p, (lo + p - 1) // p * p)
+        segment[start - lo::p] = bytes(len(range(start - lo, hi - lo, p)))
+    for i in range(lo, min(2, hi)): # 0 and 1
+        segment[i - lo] = 0
+    return segment
+
+def primes_between(lo, hi, size=2**17):
+    """
+    Generate the primes lo < q ⩽ hi in order, sieved a segment of size at a time.
+    """
+    a = lo + 1
+    while a <= hi:
+        b = min(a + size, hi + 1)
+        yield from compress(range(a, b), prime_segment(a, b))
+        a = b
+
+@lru_cache(maxsize=4)
+def smooth_exponent(B):
+    """
+    The product of the largest power of each prime p ⩽ B that is ⩽ B: lcm(1, 2, ..., B).
+    """
+    k = 1
+    for p in primes_to(B):
+        q = p
+        while q * p <= B:
+            q *= p
+        k *= q
+    return k
+
+PM1_B1 = 100000
+PM1_B2 = 5000000
+
+def pm1(n, B1=PM1_B1, B2=PM1_B2, deadline=None):
+    """
+    Pollard's p - 1: a factor p of n such that p - 1 is B1-smooth but for at most one prime
+    factor in (B1, B2]; or None.
+
+    Stage 1 raises a = 2 to lcm(1, ..., B1), so that a ≡ 1 (mod p) for every such p with a
+    B1-smooth p - 1, and gcd(a - 1, n) reveals it.  Stage 2 tries each prime q in (B1, B2] as
+    the last factor: aq = a^q is stepped from one prime to the next by multiplying with a^d
+    for the gap d, and the a^q - 1 are multiplied together and checked by one gcd per block.
+    """
+    a = 2
+    for (i, p) in enumerate(primes_to(B1)): # Prime by prime, so that the deadline is heard.
+        q = p
+        while q * p <= B1:
+            q *= p
+        a = primes.power_mod(a, q, n)
+        if deadline and i % 256 == 255 and time.monotonic() > deadline:
+            return None
+    g = gcd(a - 1, n)
+    if g == n:
+        return None
+    if g > 1:
+        return g
+    steps = {}
+    (x, last, acc) = (None, None, 1)
+    for (i, q) in enumerate(primes_between(B1, B2)): # Sieved in segments, never held whole.
+        if x is None:
+            x = primes.power_mod(a, q, n)
+        else:
+            d = q - last
+            if d not in steps:
+                steps[d] = primes.power_mod(a, d, n)
+            x = (x * steps[d]) % n
+        last = q
+        acc = (acc * (x - 1)) % n
+        if i % 1024 == 1023:
+            g = gcd(acc, n)
+            if 1 < g < n:
+                return g
+            if g == n or (deadline and time.monotonic() > deadline):
+                return None
+    g = gcd(acc, n)
+    return g if 1 < g < n else None
+
+# Lenstra's elliptic curve method on Montgomery curves By² = x³ + Ax² + x, with points in
+# projective x-only coordinates (X : Z).  a24 = (A + 2)/4.
+
+def ec_double(P, a24, n):
+    (X, Z) = P
+    s = (X + Z) * (X + Z) % n
+    d = (X - Z) * (X - Z) % n
+    t = s - d
+    return ((s * d) % n, (t * (d + a24 * t)) % n)
+
+def ec_add(P, Q, D, n):
+    """
+    P + Q from P, Q and their difference D = P - Q.
+    """
+    u = (P[0] - P[1]) * (Q[0] + Q[1])
+    v = (P[0] + P[1]) * (Q[0] - Q[1])
+    return ((D[1] * (u + v) * (u + v)) % n, (D[0] * (u - v) * (u - v)) % n)
+
+def ec_multiply(k, P, a24, n, deadline=None):
+    """
+    kP by the Montgomery ladder, or None if deadline passes first.
+    """
+    if k == 1:
+        return P
+    (R0, R1) = (P, ec_double(P, a24, n))
+    for i in range(k.bit_length() - 2, -1, -1):
+        if (k >> i) & 1:
+            (R0, R1) = (ec_add(R1, R0, P, n), ec_double(R1, a24, n))
+        else:
+            (R0, R1) = (ec_double(R0, a24, n), ec_add(R1, R0, P, n))
+        if deadline and i % 4096 == 0 and time.monotonic() > deadline:
+            return None
+    return R0
+
+ECM_D = 210 # Giant step of stage 2: 2·3·5·7.
+ECM_BLOCK = 512 # Giant steps per sieved segment of stage 2.
+
+def ecm_curve(n, B1, B2, deadline=None):
+    """
+    One curve of ECM: a factor p of n such that the curve has a B1-smooth order mod p but for
+    at most one prime in (B1, B2]; or None.
+
+    The curve and its point come from Suyama's parametrisation with a random σ, which makes
+    the group order divisible by 12.  Stage 1 multiplies the point by lcm(1, ..., B1): if the
+    order mod p divides it, the result is the identity mod p and gcd(Z, n) reveals p.  Stage 2
+    covers each prime q = kD ± j in (B1, B2] with baby steps jQ (j < D/2, prime to D) and giant
+    steps kDQ: qQ is the identity exactly when x(kDQ) = x(jQ), so the cross products
+    X_k·Z_j - X_j·Z_k are multiplied together and checked by one gcd per giant step block.
+    """
+    σ = uniform(6, n - 1)
+    u = (σ * σ - 5) % n
+    v = (4 * σ) % n
+    P = (pow(u, 3, n), pow(v, 3, n))
+    den = (16 * pow(u, 3, n) * v) % n
+    g = gcd(den, n)
+    if g > 1:
+        return g if g < n else None
+    a24 = (pow(v - u, 3, n) * (3 * u + v) * primes.inverse(den, n)) % n
+    Q = ec_multiply(smooth_exponent(B1), P, a24, n, deadline)
+    if Q is None:
+        return None
+    g = gcd(Q[1], n)
+    if g > 1:
+        return g if g < n else None
+    # Stage 2.
+    Q2 = ec_double(Q, a24, n)
+    baby = {1: Q, 3: ec_add(Q2, Q, Q, n)}
+    for j in range(5, ECM_D // 2, 2):
+        baby[j] = ec_add(baby[j - 2], Q2, baby[j - 4], n)
+    baby = [(j, baby[j]) for j in baby if gcd(j, ECM_D) == 1]
+    DQ = ec_multiply(ECM_D, Q, a24, n)
+    k = max(1, B1 // ECM_D)
+    R = ec_multiply(k, DQ, a24, n)
+    R_prev = ec_multiply(k - 1, DQ, a24, n) if k > 1 else None
+    acc = 1
+    while k * ECM_D - ECM_D // 2 <= B2:
+        # The primes around the next block of giant steps, clipped to (B1, B2].
+        lo = max(k * ECM_D - ECM_D // 2, B1 + 1)
+        hi = min((k + ECM_BLOCK) * ECM_D - ECM_D // 2, B2 + 1)
+        flags = prime_segment(lo, hi)
+        for _ in range(ECM_BLOCK):
+            c = k * ECM_D
+            if c - ECM_D // 2 >= hi:
+                break
+            for (j, (X, Z)) in baby:
+                if (lo <= c - j < hi and flags[c - j - lo]) or (lo <= c + j < hi and flags[c + j - lo]):
+                    acc = (acc * (R[0] * Z - X * R[1])) % n
+            if R_prev is None:
+                (R, R_prev) = (ec_double(R, a24, n), R)
+            else:
+                (R, R_prev) = (ec_add(R, DQ, R_prev, n), R)
+            k += 1
+            if k % 64 == 0:
+                g = gcd(acc, n)
+                if 1 < g < n:
+                    return g
+                if g == n or (deadline and time.monotonic() > deadline):
+                    return None
+    g = gcd(acc, n)
+    return g if 1 < g < n else None
+
+ECM_SCHEDULE = [(2000, 25), (11000, 90), (50000, 300), (250000, 700), (1000000, 1800)]
+# (B1, curves) for factors of about 15, 20, 25, 30 and 35 digits; B2 = 100·B1.
+
+def ecm(n, schedule=ECM_SCHEDULE, deadline=None):
+    """
+    A factor of n by ECM, trying the curves of each level of the schedule in turn and then the
+    last level for as long as it takes; None if deadline passes first.
+    """
+    level = 0
+    while True:
+        (B1, curves) = schedule[level]
+        for _ in range(curves):
+            g = ecm_curve(n, B1, 100 * B1, deadline)
+            if g:
+                return g
+            if deadline and time.monotonic() > deadline:
+                return None
+        level = min(level + 1, len(schedule) - 1)
+
+STAGES = ["trial", "power", "rho", "pm1", "ecm"]
+
+BUDGETS = {"trial": None, "power": None, "rho": 1.0, "pm1": 5.0, "ecm": None}
+# Seconds each stage may spend in one run of factor_stages; None for no limit.
+
+def run_stage(stage, n, deadline, engine=None):
+    """
+    The pieces into which the stage splits the composite n, or None.
+    """
+    if stage == "trial":
+        return trial_stage(n, deadline)
+    if stage == "power":
+        return power_stage(n, deadline)
+    d = {"pm1": lambda: pm1(n, deadline=deadline),
+         "rho": lambda: rho(n, engine, deadline),
+         "ecm": lambda: ecm(n, deadline=deadline)}[stage]()
+    return None if d is None else [d, n // d]
+
+def factor_stages(n, budgets=None, policy=None, engine=None):
+    """
+    Factor n by the staged pipeline, reporting the stage that found each factor.
+
+    budgets overrides BUDGETS stage by stage; engine is the rho engine.  Returns a list of
+    (factor, stage) pairs, where stage is the one whose split left the factor standing alone
+    (None for n itself when it is prime or 1).  A composite that no stage could split within
+    its budget is returned with the stage None.
+    """
+    budgets = dict(BUDGETS, **(budgets or {}))
+    spent = dict.fromkeys(STAGES, 0.0)
+    found = []
+    work  = [(n, 0, None)] # (number, first stage to try, the stage that produced it)
+    while work:
+        (m, first, by) = work.pop()
+        if m == 1 and by is not None:
+            continue
+        if m == 1 or is_prime(m, policy=policy):
+            found.append((m, by))
+            continue
+        for s in range(first, len(STAGES)):
+            stage  = STAGES[s]
+            budget = budgets[stage]
+            if budget is not None and spent[stage] >= budget:
+                continue
+            deadline = None if budget is None else time.monotonic() + budget - spent[stage]
+            start  = time.monotonic()
+            pieces = run_stage(stage, m, deadline, engine)
+            spent[stage] += time.monotonic() - start
+            if pieces:
+                work.extend((x, 1, stage) for x in pieces)
+                break
+        else:
+            found.append((m, None))
+    return found
+
+def factor(n, policy=None, engine=None):
+    """
+    Factor n into primes by the staged pipeline (see factor_stages), testing each piece with
+    is_prime under the given primality policy (primality_policy by default); engine picks the
+    rho (see RHO_ENGINES).  ECM has no time limit, so every factor is found in the end.
+    """
+    return [f for (f, _) in factor_stages(n, policy=policy, engine=engine)]
 
 # Interactive test
 
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# BSD 2-Clause License
+#
+# Copyright (c) 2021, Darrell Long
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Offline/online precomputation: a bounded pool of values that do not depend on the message,
+refilled in the background and handed out one at a time.
+
+Several schemes spend nearly all of an encryption on work that could have been done before the
+message arrived: ElGamal's γ = r^k and mask b^k, Paillier's r^n mod n².  A PrecomputePool
+keeps a supply of such values.  A daemon thread tops it up to the high watermark whenever it
+falls to the low one, so the online step is left with a multiplication or two.  Under the GIL
+the thread adds no processor time; what it does is move the work into the time the caller
+spends waiting on everything else.
+
+Every value is removed from the pool as it is handed out and is never handed out again: these
+are one-time values, and reusing one would reveal the ratio of two plaintexts.  When the pool is
+empty the caller computes a fresh value itself, which is counted as a miss.
+"""
+
+import threading
+from collections import deque
+
+class PrecomputePool:
+    def __init__(self, produce, low=64, high=256):
+        """
+        Keep between low and high values made by calling produce(), starting now.
+        """
+        if not 0 <= low < high:
+            raise ValueError("PrecomputePool needs 0 <= low < high")
+        self.produce  = produce
+        self.low      = low
+        self.high     = high
+        self.items    = deque()
+        self.hits     = 0
+        self.misses   = 0
+        self.produced = 0
+        self.closed   = False
+        self.ready    = threading.Condition()
+        self.filler   = threading.Thread(target=self._fill, daemon=True)
+        self.filler.start()
+
+    def _fill(self):
+        while True:
+            with self.ready:
+                while not self.closed and len(self.items) > self.low:
+                    self.ready.wait()
+                if self.closed:
+                    return
+            while True: # Refill outside the lock so that take() is never kept waiting.
+                item = self.produce()
+                with self.ready:
+                    if self.closed:
+                        return
+                    self.items.append(item)
+                    self.produced += 1
+                    if len(self.items) >= self.high:
+                        break
+
+    def take(self):
+        """
+        Remove and return one value, computing it on the spot if the pool is empty.
+        """
+        with self.ready:
+            if self.items:
+                self.hits += 1
+                item = self.items.popleft()
+                if len(self.items) <= self.low:
+                    self.ready.notify()
+                return item
+            self.misses += 1
+            self.ready.notify()
+        return self.produce()
+
+    def metrics(self):
+        """
+        The current depth of the pool and its running counts.
+        """
+        with self.ready:
+            return {"depth": len(self.items), "hits": self.hits, "misses": self.misses,
+                    "produced": self.produced, "low": self.low, "high": self.high}
+
+    def close(self):
+        """
+        Stop the refilling thread and discard the values that were never used.
+        """
+        with self.ready:
+            self.closed = True
+            self.items.clear()
+            self.ready.notify()
+        self.filler.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PooledEncryptor:
+    """
+    What an offline/online encryptor of any scheme has in common: a PrecomputePool of the
+    message-independent values, its metrics, and close, also as a context manager.  A scheme
+    subclasses it, calls __init__ with its producer and implements encrypt with pool.take().
+    """
+    def __init__(self, produce, low=64, high=256):
+        self.pool = PrecomputePool(produce, low, high)
+
+    def metrics(self): return self.pool.metrics()
+
+    def close(self): self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -61,7 +61,7 @@ def power(a, d):
         d //= 2 # Shift exponent one bit
     return v
 
-def power_mod(a, b, n):
+def power_mod_binary(a, b, n):
     """
      b
     a (mod n) using the method of repeated squares.
@@ -79,6 +79,137 @@ def power_mod(a, b, n):
         b //= 2         # Shift exponent one bit
     return v
 
+# Windowed exponentiation.
+#
+# Repeated squaring multiplies once for every 1 bit of the exponent, about half of them.  Taking
+# the exponent w bits at a time instead, with the powers a^u for every w-bit digit u computed
+# beforehand, costs the same squarings but only one multiplication per window.  The exponent is
+# recoded into a list of steps (s, u): square s times, then multiply by a^u (u = 0: do not).
+
+def window_bits(bits):
+    """
+    The window width that minimizes squarings + multiplications + table size for an exponent of
+    the given bit length.
+    """
+    for (size, w) in [(672, 6), (240, 5), (80, 4), (24, 3)]:
+        if bits >= size:
+            return w
+    return 1
+
+def kary_recode(e, w):
+    """
+    Recode e as its base-2ʷ digits from the top (fixed windows): every step squares w times.
+    """
+    steps = []
+    for shift in range(((e.bit_length() + w - 1) // w - 1) * w, -1, -w):
+        steps.append((w, (e >> shift) & ((1 << w) - 1)))
+    return steps
+
+def sliding_recode(e, w):
+    """
+    Recode e for sliding windows: runs of 0 bits are skipped with squarings alone, and each window
+    starts and ends on a 1 bit, so every digit is odd and only the odd powers need a table.
+    """
+    bits  = bin(e)[2:] if e > 0 else ''
+    steps = []
+    (i, zeros) = (0, 0)
+    while i < len(bits):
+        if bits[i] == '0':
+            (i, zeros) = (i + 1, zeros + 1)
+        else:
+            j = min(i + w, len(bits))
+            while bits[j - 1] == '0':
+                j -= 1
+            steps.append((zeros + j - i, int(bits[i:j], 2)))
+            (i, zeros) = (j, 0)
+    if zeros > 0:
+        steps.append((zeros, 0))
+    return steps
+
+def power_steps(a, steps, n):
+    """
+    Evaluate a recoded exponent: a raised to the exponent of steps (mod n).
+    """
+    a = a % n
+    top = max([u for (_, u) in steps] + [1])
+    table = [1, a] + [0] * (top - 1) # table[u] = a^u (mod n) for every digit u that occurs.
+    if any(u > 0 and is_even(u) for (_, u) in steps):
+        for u in range(2, top + 1):
+            table[u] = (table[u - 1] * a) % n
+    else:
+        a2 = (a * a) % n
+        for u in range(3, top + 1, 2):
+            table[u] = (table[u - 2] * a2) % n
+    v = 1
+    for (s, u) in steps:
+        for _ in range(s):
+            v = (v * v) % n
+        if u > 0:
+            v = (v * table[u]) % n
+    return v
+
+POWER_MODES = ["sliding", "kary", "binary", "native"]
+
+power_mode = "sliding"
+
+def set_power_mode(mode):
+    """
+    Select the engine power_mod uses when none is given, and return the one it replaces:
+    sliding or fixed (k-ary) windows, repeated squaring, or Python's built-in pow.
+    """
+    global power_mode
+    if mode not in POWER_MODES:
+        raise ValueError(f"unknown power mode {mode!r}")
+    (previous, power_mode) = (power_mode, mode)
+    return previous
+
+def power_mod(a, b, n, mode=None):
+    """
+     b
+    a (mod n) by the given engine, or by power_mode if none is given.  The windowed engines
+    choose their width from the size of b.
+    """
+    mode = mode or power_mode
+    if mode == "native":
+        return pow(a, b, n)
+    if mode == "binary" or b <= 0:
+        return power_mod_binary(a, b, n)
+    w = window_bits(b.bit_length())
+    return power_steps(a, kary_recode(b, w) if mode == "kary" else sliding_recode(b, w), n)
+
+def multi_power_mod(bases, exps, n, w=None):
+    """
+    The product of aᵢ^(eᵢ) (mod n) by Straus's method.
+
+    Rather than one exponentiation per base, the exponents are read together in w-bit digits
+    from the top: the squarings are shared by all the bases, and each base adds one
+    multiplication per nonzero digit from its own table aᵢ⁰, …, aᵢ^(2ʷ-1).  For k exponents of
+    b bits this costs b squarings in all rather than k·b.
+    """
+    bases = [a % n for a in bases]
+    exps  = list(exps)
+    if any(e < 0 for e in exps):
+        raise ValueError("multi_power_mod needs nonnegative exponents")
+    bits = max((e.bit_length() for e in exps), default=0)
+    w = w or window_bits(bits)
+    tables = []
+    for a in bases:
+        t = [1, a]
+        for _ in range(2**w - 2):
+            t.append((t[-1] * a) % n)
+        tables.append(t)
+    mask = 2**w - 1
+    x = 1 % n
+    for shift in range((bits - 1) // w * w, -1, -w):
+        if x != 1:
+            for _ in range(w):
+                x = (x * x) % n
+        for (t, e) in zip(tables, exps):
+            d = (e >> shift) & mask
+            if d:
+                x = (x * t[d]) % n
+    return x
+
 def perfect_power(n):
     """
                            b                                                    2
@@ -128,15 +259,47 @@ def witness(a, n):
 
 from random import randrange as uniform
 
+# Below each bound, no composite is a strong pseudoprime to all of the bases that follow it, so
+# Miller-Rabin with those bases is a proof of primality (Jaeschke 1993; Zhang and Tang 2003;
+# Sorenson and Webster 2015).  Every n < 2⁶⁴ is settled by the first twelve primes.
+
+MR_BASES = [
+    (2047,                       [2]),
+    (1373653,                    [2, 3]),
+    (25326001,                   [2, 3, 5]),
+    (3215031751,                 [2, 3, 5, 7]),
+    (2152302898747,              [2, 3, 5, 7, 11]),
+    (3474749660383,              [2, 3, 5, 7, 11, 13]),
+    (341550071728321,            [2, 3, 5, 7, 11, 13, 17]),
+    (3825123056546413051,        [2, 3, 5, 7, 11, 13, 17, 19, 23]),
+    (318665857834031151167461,   [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]),
+    (3317044064679887385961981,  [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]),
+]
+
+def mr_bases(n):
+    """
+    The smallest set of Miller-Rabin bases that proves n prime, or None if n is too large.
+    """
+    for (bound, bases) in MR_BASES:
+        if n < bound:
+            return bases
+    return None
+
 def is_prime_MR(n, k=100):
     """
     Miller-Rabin probabilistic primality test of n with confidence k.
+
+    Below the bounds of MR_BASES the fixed bases make the test deterministic and k is not needed.
     """
     if n < 2 or (n != 2 and n % 2 == 0):
         return False
     if n == 2 or n == 3:
         return True
 
+    bases = mr_bases(n)
+    if bases is not None:
+        return not any(witness(a, n) for a in bases)
+
     for _ in range (0, k):
         a = uniform(2, n - 1) # Euler witness (or liar)
         if witness(a, n):
@@ -203,37 +366,63 @@ def halve(x, n):
         x += n
     return x // 2
 
+def lucas_sequence(k, n, p, d):
+    """
+    Computes (U_k, V_k, q^k) (mod n) for the Lucas sequences with parameters p and
+    q = (p² - d) / 4, for odd n.
+
+    The ladder scans the bits of k from the top, so it needs no recursion and keeps just three
+    residues.  From (U_j, V_j, q^j) doubling gives
+        U_2j = U_j V_j,   V_2j = V_j² - 2q^j,
+    and a 1 bit then steps to j + 1:
+        U_j+1 = (p U_j + V_j) / 2,   V_j+1 = (d U_j + p V_j) / 2.
+    """
+    q = (p * p - d) // 4
+    (U, V, Q) = (1, p % n, q % n)
+    for bit in bin(k)[3:]:
+        U = (U * V) % n
+        V = (V * V - 2 * Q) % n
+        Q = (Q * Q) % n
+        if bit == '1':
+            (U, V) = (halve((p * U + V) % n, n), halve((d * U + p * V) % n, n))
+            Q = (Q * q) % n
+    return (U, V, Q)
+
 def compute_UV(i, n, p, d):
     """
     Computes the i-th element of the Lucas sequence with parameters
-    p and d, where q = (1 - d) / 4 (mod n).
-    """
-    if i == 1:
-        return (1, p)
-    elif i % 2 == 0:
-        (U_k, V_k) = compute_UV(i // 2, n, p, d)
-        U_2k = U_k * V_k
-        V_2k = halve(V_k * V_k + d * U_k * U_k, n)
-        return (U_2k % n, V_2k % n)
-    else:
-        (U_2k, V_2k) = compute_UV(i - 1, n, p, d)
-        U_2k1 = halve(p * U_2k + V_2k, n)
-        V_2k1 = halve(d * U_2k + p * V_2k, n)
-        return (U_2k1 % n, V_2k1 % n)
+    p and d, where q = (p² - d) / 4 (mod n).
+    """
+    (U, V, _) = lucas_sequence(i, n, p, d)
+    return (U, V)
+
+from math import isqrt
+
+def is_square(n): return n >= 0 and isqrt(n)**2 == n
 
 def is_prime_LS(n):
     """
     Checks if an integer is a strong Lucas probable prime.
+
+    With n + 1 = d·2ˢ, d odd, a prime n has either U_d ≡ 0 or V_(d·2ʳ) ≡ 0 (mod n) for some
+    0 ⩽ r < s.  A square n is rejected first, since Selfridge's search for d would never end.
     """
-    if n < 2 or (n != 2 and n % 2 == 0) or is_perfect_power(n):
+    if n < 2 or (n != 2 and n % 2 == 0) or is_square(n):
         return False
     if n == 2 or n == 3:
         return True
 
     (d, p, q) = choose_Selfridge(n)
-    (u, v) = compute_UV(n + 1, n, p, d)
-
-    return  u == 0 and v == (2 * q) % n
+    (k, s) = get_d_r(n + 1)
+    (u, v, qk) = lucas_sequence(k, n, p, d)
+    if u == 0 or v == 0:
+        return True
+    for _ in range(1, s):
+        v  = (v * v - 2 * qk) % n
+        qk = (qk * qk) % n
+        if v == 0:
+            return True
+    return False
 
 def is_prime_F(n):
     """
@@ -256,42 +445,375 @@ def is_prime_BPSW(n, k=100):
     """
     return is_prime_F(n) and is_prime_LS(n)
 
-# Default is to use Miller-Rabin.
+# Primality policies.
+#
+# A policy is a test is_prime(n, k) that is cheap on the numbers it is given most often: random
+# candidates, nearly all composite and most with a small factor.  Trial division disposes of
+# those, a single strong test base 2 disposes of almost all the rest, and only a number that is
+# very probably prime pays for the remaining rounds.
 
-def is_prime(n, k=100): return is_prime_MR(n, k)
+def prime_sieve(n):
+    """
+    The sieve of Eratosthenes: a bytearray of n flags, 1 at the primes p < n.
+    """
+    sieve = bytearray([1]) * n
+    sieve[0:min(n, 2)] = bytes(min(n, 2))
+    for i in range(2, n):
+        if i * i >= n:
+            break
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, n, i)))
+    return sieve
+
+def small_primes(n):
+    """
+    The sieve of Eratosthenes: return the list of primes p < n.
+    """
+    sieve = prime_sieve(n)
+    return [i for i in range(n) if sieve[i]]
+
+TRIAL_PRIMES = small_primes(256)
+
+def trial_division(n):
+    """
+    Trial division of n by TRIAL_PRIMES.  Returns True if n is proven prime, False if n is proven
+    composite, and None if n has no small factor but is too large to be settled this way.
+    """
+    if n < 2:
+        return False
+    for p in TRIAL_PRIMES:
+        if n % p == 0:
+            return n == p
+        if p * p > n:
+            return True
+    return None
+
+def mr_rounds(bits):
+    """
+    The number of Miller-Rabin rounds that bring the error on a random odd candidate of the given
+    bit length below 2⁻⁸⁰, from the average-case bounds of Damgård, Landrock and Pomerance (the
+    same bounds behind the tables of FIPS 186).  The chance that a random candidate fools a round
+    is far smaller than the worst-case 1/4, and it shrinks as candidates grow.
+    """
+    for (size, k) in [(3747, 3), (1345, 4), (476, 5), (400, 6), (347, 7), (308, 8), (55, 27)]:
+        if bits >= size:
+            return k
+    return 34
+
+def policy_rounds(n, k=None):
+    """
+    Trial division, then a strong test base 2, then k - 1 further Miller-Rabin rounds with random
+    witnesses.  By default k is chosen from the bit length of n by mr_rounds.  Below the bounds
+    of MR_BASES the remaining fixed bases are used instead, and the answer is exact.
+    """
+    small = trial_division(n)
+    if small is not None:
+        return small
+    if witness(2, n):
+        return False
+    bases = mr_bases(n)
+    if bases is not None:
+        return not any(witness(a, n) for a in bases[1:])
+    k = mr_rounds(n.bit_length()) if k is None else k
+    for _ in range(1, k):
+        if witness(uniform(2, n - 1), n):
+            return False
+    return True
+
+def policy_BPSW(n, k=None):
+    """
+    Trial division, then the Baillie-PSW test (a strong test base 2 and a Lucas test).  No
+    composite is known to pass BPSW, so there are no rounds to choose and k is ignored.
+    """
+    small = trial_division(n)
+    return is_prime_BPSW(n) if small is None else small
+
+def policy_MR(n, k=None):
+    """
+    Miller-Rabin with k rounds (100 unless given), whatever the size of n: the historical default.
+    """
+    return is_prime_MR(n, 100 if k is None else k)
+
+PRIMALITY_POLICIES = {
+    "bpsw":   policy_BPSW,
+    "rounds": policy_rounds,
+    "mr":     policy_MR,
+}
+
+primality_policy = "bpsw"
+
+def set_primality_policy(policy):
+    """
+    Select the policy is_prime uses when none is given, and return the one it replaces.
+    """
+    global primality_policy
+    if policy not in PRIMALITY_POLICIES:
+        raise ValueError(f"unknown primality policy {policy!r}")
+    (previous, primality_policy) = (primality_policy, policy)
+    return previous
+
+def is_prime(n, k=None, policy=None):
+    """
+    Test n for primality under the given policy, or under primality_policy if none is given.
+    k, if given, is the number of Miller-Rabin rounds for the policies that have rounds.
+    """
+    return PRIMALITY_POLICIES[policy or primality_policy](n, k)
 
 # Routines to generate primes
 
-def random_prime(low, high, confidence=100):
+# Odd primes used to sieve candidate windows. Every prime in the table strikes out about 1/p
+# of the candidates for the price of one remainder per window; beyond a few thousand the
+# returns are too small to pay for the slicing.
+
+SIEVE_PRIMES = small_primes(2048)[1:]
+
+def sieve_window(start, width, safe=False, step=2):
+    """
+    Sieve the window of candidates start, start + step, ..., start + step(width - 1) against
+    SIEVE_PRIMES; step is 2 (odd candidates) unless a residue class is being searched.  Returns
+    the offsets i for which start + step·i has no factor in the table (a prime in the table
+    itself survives).  With safe=True the offsets for which 2(start + step·i) + 1 has a factor
+    in the table are struck out as well.
+
+    For each p we need only one remainder: start + step·i ≡ 0 (mod p) when
+    i ≡ -start/step (mod p); for step = 2, 2⁻¹ ≡ (p + 1)/2 (mod p).  Every p-th offset from
+    there is struck out.  Likewise 2(start + step·i) + 1 ≡ 0 (mod p) when
+    i ≡ ((p - 1)/2 - start)/step (mod p).  Primes that divide step are skipped: they divide
+    every candidate or none.
+    """
+    alive = bytearray([1]) * width
+    for p in SIEVE_PRIMES:
+        if step % p == 0:
+            continue
+        half = (p + 1) // 2 if step == 2 else inverse(step % p, p)
+        i = (-start * half) % p
+        if start + step * i == p: # Do not strike out p itself.
+            i += p
+        if i < width:
+            alive[i::p] = bytes(len(range(i, width, p)))
+        if safe:
+            i = (((p - 1) // 2 - start) * half) % p
+            if 2 * (start + step * i) + 1 == p:
+                i += p
+            if i < width:
+                alive[i::p] = bytes(len(range(i, width, p)))
+    return [i for i in range(width) if alive[i]]
+
+def search_windows(low, high, residue=1, step=2):
+    """
+    Generate windows (start, width) of odd candidates start, start + 2, ..., start + 2(width - 1)
+    covering [low, high], beginning at a single random point and wrapping from high back to low,
+    so the whole range is walked before any candidate repeats.  With residue and step the
+    candidates are those ≡ residue (mod step) instead, start + step·j.
+    """
+    first = low + (residue - low) % step # The candidates are first + step·j, 0 ⩽ j < count.
+    count = (high - first) // step + 1
+    width = min(count, max(64, lg(high))) # About three prime gaps' worth of odd candidates.
+    j = uniform(0, count)
+    while True:
+        span = min(width, count - j) # Windows never run past high; the next one wraps.
+        yield (first + step * j, span)
+        j = (j + span) % count
+
+def prime_search(low, high, confidence=None, policy=None, residue=1, step=2):
+    """
+    Generate the primes in [low, high] by incremental search from a single random start.
+
+    Drawing an independent candidate for every trial throws away everything learned about its
+    neighbours.  Instead we pick one random odd start, sieve a window of odd offsets against
+    SIEVE_PRIMES, and run the full test only on the survivors—roughly 15% of the window.
+    With residue and step (step even, residue odd and prime to step) only the primes
+    ≡ residue (mod step) are generated: the candidates are taken from that class directly,
+    not by rejecting primes from the others.
+
+    Successive primes from one generator are neighbours, so never take p and q for the same
+    modulus from one search: |p - q| would be tiny and n would fall to Fermat's method.
+    """
+    if is_odd(step) or gcd(residue, step) != 1:
+        raise ValueError("prime_search needs an even step and a residue prime to it")
+    for (start, width) in search_windows(low, high, residue, step):
+        for i in sieve_window(start, width, False, step):
+            if is_prime(start + step * i, confidence, policy):
+                yield start + step * i
+
+def sophie_germain(q, confidence=None, policy=None):
+    """
+    Is q a Sophie Germain prime, that is, are both q and 2q + 1 prime?
+
+    The base-2 Fermat test, q first and then 2q + 1, costs one exponentiation each and rejects
+    nearly every composite, so the full test is spent only on pairs that are almost surely prime.
+    """
+    p = 2 * q + 1
+    return (power_mod(2, q - 1, q) == 1 and power_mod(2, p - 1, p) == 1
+            and is_prime(q, confidence, policy) and is_prime(p, confidence, policy))
+
+def safe_prime_search(low, high, confidence=None, policy=None):
+    """
+    Generate safe primes 2q + 1 with q in [low, high] by incremental search from a single
+    random start.
+
+    Both q and 2q + 1 must be prime, so the window is sieved for both at once: a small factor of
+    either one strikes the candidate out.  Survivors are screened by sophie_germain.
+    """
+    for (start, width) in search_windows(low, high):
+        for i in sieve_window(start, width, True):
+            q = start + 2 * i
+            if sophie_germain(q, confidence, policy):
+                yield 2 * q + 1
+
+def random_prime(low, high, confidence=None, workers=1, policy=None):
     """
     Generate and return a random prime in the range [low, high].
+
+    Each call starts a fresh prime_search from a new random point and returns the first prime
+    it finds.  Candidates are tested by is_prime(c, confidence, policy), so by default under
+    primality_policy with its own choice of rounds.  With workers > 1 the candidates are tested
+    by a pool of processes, which returns the same prime the serial search would have.
     """
-    guess = 0 # Certainly not prime!
-    while is_even(guess) or not is_prime(guess, confidence):
-        guess = uniform(low, high) # Half will be even, the rest have Pr[prime] ≈ 1/log(N).
-    return guess
+    if workers > 1:
+        return parallel_search([(low, high, False)], workers, confidence, policy)[0]
+    return next(prime_search(low, high, confidence, policy))
 
-def safe_prime(low, high, confidence=100):
+def safe_prime(low, high, confidence=None, workers=1, policy=None):
     """
-    Generate and return a safe prime in the range [low, high].
+    Generate and return a safe prime 2q + 1 with q in the range [low, high].
 
-    A safe prime follows a Sophie Germain prime. If prime(p) and prime(2p + 1) then p is a
-    Sophie Germain prime and 2p + 1 is a safe prime.
+    A safe prime follows a Sophie Germain prime. If prime(q) and prime(2q + 1) then q is a
+    Sophie Germain prime and 2q + 1 is a safe prime.  Each call starts a fresh
+    safe_prime_search from a new random point; workers is as for random_prime.
     """
-    p = random_prime(low, high)
-    while not is_prime(2 * p + 1, confidence):
-        p = random_prime(low, high)
-    return 2 * p + 1
+    if workers > 1:
+        return parallel_search([(low, high, True)], workers, confidence, policy)[0]
+    return next(safe_prime_search(low, high, confidence, policy))
 
-def rabin_prime(low, high, safe=True):
+def distinct_primes(count, low, high, safe=False, confidence=None, workers=1, policy=None):
     """
-    Generate a Rabin prime p ≢ 3 (mod 4), low ⩽ p ⩽ high. Default is to use a safe prime.
+    Generate a list of count distinct random (or safe) primes from the same range.  With
+    workers > 1 all of the searches share one pool of processes and run at the same time.
     """
     f = safe_prime if safe else random_prime
-    p = f(low, high)
-    while p % 4 != 3:
-        p = f(low, high)
-    return p
+    if workers > 1:
+        found = parallel_search([(low, high, safe)] * count, workers, confidence, policy)
+    else:
+        found = [f(low, high, confidence, 1, policy) for _ in range(count)]
+    for i in range(1, count):
+        while found[i] in found[:i]:
+            found[i] = f(low, high, confidence, workers, policy)
+    return found
+
+def prime_pair(low, high, safe=False, confidence=None, workers=1, policy=None):
+    """
+    Generate two distinct random (or safe) primes from the same range, as the two-prime
+    schemes need for p and q.  With workers > 1 both searches share one pool of processes and
+    run at the same time.
+    """
+    (p, q) = distinct_primes(2, low, high, safe, confidence, workers, policy)
+    return (p, q)
+
+# Parallel prime search.
+#
+# The parent walks each search exactly as prime_search (or safe_prime_search) would: one random
+# start, sieved windows.  The survivors are dealt out in numbered chunks to a pool of processes,
+# and the answer is the first prime of the lowest-numbered chunk that holds one, which is the
+# prime the serial search would have returned from the same start.  All of the randomness is
+# spent in the parent, so the result is reproducible under random.seed() whatever the number
+# of workers (the serial search also draws witnesses for is_prime, so the draws that follow it
+# differ).
+#
+# Cancellation is cooperative: each search has a slot in a shared array holding the lowest chunk
+# known to contain a prime.  Workers check it before every test and abandon any chunk numbered
+# above it, and the parent stops dealing chunks past it.
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+_UNFOUND = 2**63 - 1 # Largest value a shared 'q' slot can hold.
+
+_found = None # Shared array of the lowest chunk with a prime, one slot per search.
+
+def _init_search(found):
+    global _found
+    _found = found
+
+def _search_chunk(s, k, chunk, safe, confidence, policy):
+    """
+    Worker: return the first prime (or safe prime) in chunk k of search s, or None.
+    """
+    for c in chunk:
+        if _found[s] < k:
+            return None # Someone has already found a prime earlier in the search.
+        if sophie_germain(c, confidence, policy) if safe else is_prime(c, confidence, policy):
+            with _found.get_lock():
+                if k < _found[s]:
+                    _found[s] = k
+            return 2 * c + 1 if safe else c
+    return None
+
+def search_chunks(low, high, safe=False, size=4):
+    """
+    Generate the candidates of prime_search (or of safe_prime_search, in which case they are q
+    rather than 2q + 1) in order, in lists of size survivors of the sieve.
+    """
+    for (start, width) in search_windows(low, high):
+        alive = sieve_window(start, width, safe)
+        for i in range(0, len(alive), size):
+            yield [start + 2 * a for a in alive[i:i + size]]
+
+def parallel_search(searches, workers, confidence=None, policy=None):
+    """
+    Run the searches, a list of (low, high, safe) triples, on a pool of workers processes and
+    return the list of primes found, one per search.
+    """
+    policy  = policy or primality_policy # The workers are to test as the caller would.
+    context = multiprocessing.get_context()
+    found   = context.Array('q', [_UNFOUND] * len(searches))
+    feeds   = []
+    for (low, high, safe) in searches:
+        feed = enumerate(search_chunks(low, high, safe))
+        feeds.append([next(feed), feed, safe]) # Draw the random starts now, in a fixed order.
+    answers = [None] * len(searches)
+    settled = [0] * len(searches)          # Every chunk below this one held no prime.
+    results = [{} for _ in searches]       # Finished chunks above settled.
+    running = {}
+    pool = ProcessPoolExecutor(workers, mp_context=context,
+                               initializer=_init_search, initargs=(found,))
+    try:
+        while None in answers:
+            dealt = True
+            while dealt and len(running) < 2 * workers:
+                dealt = False
+                for s, feed in enumerate(feeds):
+                    ((k, chunk), rest, safe) = feed
+                    if answers[s] is None and k <= found[s] and len(running) < 2 * workers:
+                        running[pool.submit(_search_chunk, s, k, chunk, safe, confidence, policy)] = (s, k)
+                        feed[0] = next(rest)
+                        dealt = True
+            (done, _) = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                (s, k) = running.pop(future)
+                results[s][k] = future.result()
+                while answers[s] is None and settled[s] in results[s]:
+                    answers[s] = results[s].pop(settled[s])
+                    settled[s] += 1
+    finally:
+        for s in range(len(searches)):
+            found[s] = -1 # Call off whatever is still running.
+        pool.shutdown(wait=True, cancel_futures=True)
+    return answers
+
+def rabin_prime(low, high, safe=True):
+    """
+    Generate a Rabin prime p ≡ 3 (mod 4), low ⩽ p ⩽ high. Default is to use a safe prime.
+
+    Square roots mod such a p take one exponentiation, a^((p+1)/4).  A safe prime 2q + 1 with q
+    odd is always ≡ 3 (mod 4); otherwise the search runs over the candidates ≡ 3 (mod 4) only.
+    """
+    if safe:
+        p = safe_prime(low, high)
+        while p % 4 != 3: # Only q = 2, the safe prime 5.
+            p = safe_prime(low, high)
+        return p
+    return next(prime_search(low, high, residue=3, step=4))
 
 def extended_GCD(a, b):
     """
@@ -339,6 +861,182 @@ def inverse(a, n):
         return None
     return s + n if s < 0 else s
 
+def tonelli_shanks(a, p, z):
+    """
+    A square root of the residue a (mod p) by Tonelli-Shanks, given a non-residue z.
+
+    With p - 1 = Q·2ˢ, Q odd, the guess r = a^((Q+1)/2) is off by t = a^Q, whose order is a
+    power of 2.  Each round finds that order 2ⁱ by squaring and cancels it with a power of
+    c = z^Q, which has order exactly 2ˢ; i falls every round, so at most S rounds of up to S
+    squarings.
+    """
+    (Q, S) = (p - 1, 0)
+    while is_even(Q):
+        (Q, S) = (Q // 2, S + 1)
+    (M, c, t, r) = (S, power_mod(z, Q, p), power_mod(a, Q, p), power_mod(a, (Q + 1) // 2, p))
+    while t != 1:
+        (i, u) = (0, t)
+        while u != 1:
+            (i, u) = (i + 1, (u * u) % p)
+        b = power_mod(c, 2**(M - i - 1), p)
+        (M, c) = (i, (b * b) % p)
+        (t, r) = ((t * c) % p, (r * b) % p)
+    return r
+
+def cipolla(a, p, z):
+    """
+    A square root of the residue a (mod p) by Cipolla's method, given z with z² - a a non-residue.
+
+    In the field F_p(ω), ω² = z² - a, the element z + ω raised to (p + 1)/2 is a square root of
+    (z + ω)^(p+1) = z² - ω² = a, and it lies in F_p.  One exponentiation of pairs whatever the
+    power of 2 in p - 1.
+    """
+    w = (z * z - a) % p
+    def times(x, y): # (x₀ + x₁ω)(y₀ + y₁ω)
+        return ((x[0] * y[0] + x[1] * y[1] * w) % p, (x[0] * y[1] + x[1] * y[0]) % p)
+    (r, b, e) = ((1, 0), (z, 1), (p + 1) // 2)
+    while e > 0:
+        if is_odd(e):
+            r = times(r, b)
+        b = times(b, b)
+        e >>= 1
+    return r[0]
+
+def sqrt_mod(a, p):
+    """
+    A square root of a (mod the odd prime p), or None if a is not a quadratic residue.
+
+    p ≡ 3 (mod 4):  a^((p+1)/4).
+    p ≡ 5 (mod 8):  Atkin's formula, one exponentiation.
+    otherwise:      Tonelli-Shanks, whose cost grows as S² for p - 1 = Q·2ˢ, so when S is
+                    large Cipolla's method, which costs about two exponentiations, is used.
+    """
+    a = a % p
+    if a == 0:
+        return 0
+    if Jacobi(a, p) != 1:
+        return None
+    if p % 4 == 3:
+        return power_mod(a, (p + 1) // 4, p)
+    if p % 8 == 5:
+        v = power_mod(2 * a, (p - 5) // 8, p)
+        i = (2 * a * v * v) % p
+        return (a * v * (i - 1)) % p
+    S = ((p - 1) & (1 - p)).bit_length() - 1 # The power of 2 in p - 1.
+    if S * (S - 1) > 8 * p.bit_length() + 20:
+        z = 1
+        while Jacobi(z * z - a, p) != -1:
+            z += 1
+        return cipolla(a, p, z)
+    z = 2
+    while Jacobi(z, p) != -1:
+        z += 1
+    return tonelli_shanks(a, p, z)
+
+class FixedBase:
+    """
+    Powers of a fixed base g (mod n) from a table built once, by Yao's method.
+
+    The table holds g_i = g^(2^(wi)) for every w-bit digit position i of an exponent of up to
+    bits bits, so g^e = ∏ g_i^(e_i) for the base-2ʷ digits e_i of e and no squarings are
+    left to do.  Yao's method collects the product digit value by digit value, from the
+    largest down:
+        y ← y·∏{g_i : e_i = d},  z ← z·y   for d = 2ʷ - 1, ..., 1,
+    so that each g_i ends up multiplied into z exactly e_i times.  That costs one multiplication
+    per digit and one per digit value, about bits/w + 2ʷ, against roughly bits squarings
+    for power_mod, and the table has only bits/w entries.
+    """
+    def __init__(self, g, n, bits, w=None):
+        self.n = n
+        self.w = w or window_bits(bits)
+        self.powers = []
+        x = g % n
+        for _ in range((bits + self.w - 1) // self.w):
+            self.powers.append(x)
+            for _ in range(self.w):
+                x = (x * x) % n
+
+    def pow(self, e):
+        """
+         e
+        g  (mod n); exponents too large for the table fall back to power_mod.
+        """
+        if e < 0 or e.bit_length() > self.w * len(self.powers):
+            return power_mod(self.powers[0], e, self.n)
+        mask = (1 << self.w) - 1
+        by_digit = [[] for _ in range(mask + 1)]
+        for g in self.powers:
+            by_digit[e & mask].append(g)
+            e >>= self.w
+        (y, z) = (1, 1)
+        for d in range(mask, 0, -1):
+            for g in by_digit[d]:
+                y = (y * g) % self.n
+            if y != 1:
+                z = (z * y) % self.n
+        return z % self.n
+
+class FixedExponent:
+    """
+    Powers to a fixed exponent e (mod n) from a recoding of e made once.
+
+    Cocks and Schmidt-Samoa encrypt with the modulus itself as the exponent, so every
+    encryption under a key raises to the same e.  The sliding-window recoding of e is made
+    here once, with the width that costs fewest multiplications for this e (a table of
+    2^(w-1) odd powers against one multiplication per window), and each pow only evaluates it.
+    """
+    def __init__(self, e, n, w=None):
+        self.e = e
+        self.n = n
+        if w is None:
+            cost = lambda w: 2**(w - 1) + sum(1 for (_, u) in sliding_recode(e, w) if u)
+            w = min(range(1, 9), key=cost)
+        self.w = w
+        self.steps = sliding_recode(e, w)
+        self.top   = max([u for (_, u) in self.steps] + [1]) # Largest digit: the table's size.
+
+    def pow(self, a):
+        """
+         e
+        a  (mod n)
+        """
+        n = self.n
+        a = a % n
+        a2 = (a * a) % n
+        table = [1, a] + [0] * (self.top - 1) # Only the odd powers: every digit is odd.
+        for u in range(3, self.top + 1, 2):
+            table[u] = (table[u - 2] * a2) % n
+        v = 1
+        for (s, u) in self.steps:
+            for _ in range(s):
+                v = (v * v) % n
+            if u > 0:
+                v = (v * table[u]) % n
+        return v
+
+    def pow_many(self, as_):
+        """
+        The power of every a in the iterable as_, yielded in order.
+        """
+        for a in as_:
+            yield self.pow(a)
+
+from functools import lru_cache
+
+@lru_cache(maxsize=16)
+def fixed_exponent(e, n):
+    """
+    The FixedExponent for e (mod n), built on first use and kept for the next call.
+    """
+    return FixedExponent(e, n)
+
+def fixed_power(a, e, n):
+    """
+     e
+    a  (mod n) by the kept recoding of e; a module-level function, so bulk workers can run it.
+    """
+    return fixed_exponent(e, n).pow(a)
+
 def group_generator(n, p):
     """
     Creates a generator in the neighborhood of n for the group defined by p.
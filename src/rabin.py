@@ -73,12 +73,16 @@ def decrypt(m, key):
     square roots (±√m mod p and ±√m mod q), which CRT combines into four roots
     mod n.  Only the root whose low 32 bits equal _h is the true payload; the
     other three are discarded.  The original message is the payload >> 32.
+
+    For p ≡ 3 (mod 4) the root mod p is m^((p+1)/4); primes.sqrt_mod finds it for any prime.
     """
     (p, q) = key
     n = p * q
     (g, (yP, yQ)) = primes.extended_GCD(p, q)
-    mP = primes.power_mod(m, (p + 1) // 4, p)
-    mQ = primes.power_mod(m, (q + 1) // 4, q)
+    mP = primes.sqrt_mod(m, p)
+    mQ = primes.sqrt_mod(m, q)
+    if mP is None or mQ is None:
+        raise ValueError("Decryption failed: the ciphertext is not a square.")
     x = (yP * p * mQ + yQ * q * mP) % n
     y = (yP * p * mQ - yQ * q * mP) % n
     msgs = [x - n // 2, n - x - n // 2, y - n // 2, n - y - n // 2]
@@ -87,6 +91,33 @@ def decrypt(m, key):
             return d // 2**32
     raise ValueError("Decryption failed: no valid square root with matching CRC tag found.")
 
+from functools import lru_cache
+
+@lru_cache(maxsize=16)
+def private_key(key):
+    """
+    The RabinPrivateKey for (p, q), built on first use and kept for the next.
+    """
+    return RabinPrivateKey(*key)
+
+import bulk
+
+def _decrypt_keyed(c, key):
+    return private_key(key).decrypt(c) # Each worker sets the key up once.
+
+def encrypt_many(ms, n, workers=None, chunk=64):
+    """
+    The tagged squares m² mod n for every m in the iterable ms, in order (see bulk.stream).
+    """
+    return bulk.stream(encrypt, (n,), ms, workers, chunk)
+
+def decrypt_many(cs, key, workers=None, chunk=64):
+    """
+    The plaintexts of the Rabin ciphertexts in cs, in order (see bulk.stream).  Each worker
+    sets up one RabinPrivateKey for (p, q) and picks, of the four roots, the one with the tag.
+    """
+    return bulk.stream(_decrypt_keyed, (key,), cs, workers, chunk)
+
 import crypto_io as _io
 
 # ── Serialization ─────────────────────────────────────────────────────────────
@@ -117,6 +148,80 @@ def rabin_private_from_xml(xml):
     r = _io.xml_unwrap("RabinPrivateKey", ["n", "p", "q"], xml)
     return (r[1], r[2]) if r and len(r) == 3 else None  # return (p, q)
 
+# ── Private key ───────────────────────────────────────────────────────────────
+
+class RabinPrivateKey:
+    """
+    A Rabin private key (p, q) with everything decrypt needs that does not depend on the
+    ciphertext computed once: n, the CRT coefficients yP·p and yQ·q (mod n) from the Bézout
+    identity yP·p + yQ·q = 1, the exponents (p+1)/4 and (q+1)/4 (for primes ≡ 3 mod 4; roots
+    mod other primes come from primes.sqrt_mod), and n/2.
+    """
+    def __init__(self, p, q):
+        (self.p, self.q) = (p, q)
+        self.n = p * q
+        (_, (yP, yQ)) = primes.extended_GCD(p, q)
+        self.cP = (yP * p) % self.n # ≡ 1 (mod q), ≡ 0 (mod p)
+        self.cQ = (yQ * q) % self.n # ≡ 1 (mod p), ≡ 0 (mod q)
+        self.eP = (p + 1) // 4 if p % 4 == 3 else None # Otherwise primes.sqrt_mod.
+        self.eQ = (q + 1) // 4 if q % 4 == 3 else None
+        self.half = self.n // 2
+
+    @classmethod
+    def generate(cls, n_bits, safe=True):
+        return cls(*generate_keys(n_bits, safe)[1])
+
+    @classmethod
+    def from_tuple(cls, key):
+        """
+        From (p, q) as returned by generate_keys or the private-key readers.
+        """
+        return cls(*key)
+
+    from_blob = _io.key_reader(rabin_private_from_blob)
+    from_pem  = _io.key_reader(rabin_private_from_pem)
+    from_xml  = _io.key_reader(rabin_private_from_xml)
+
+    def to_tuple(self):         return (self.p, self.q)
+    def to_blob(self):          return rabin_private_to_blob(self.n, self.p, self.q)
+    def to_pem(self):           return rabin_private_to_pem(self.n, self.p, self.q)
+    def to_xml(self):           return rabin_private_to_xml(self.n, self.p, self.q)
+
+    def public_key(self):       return self.n
+
+    def decrypt(self, c):
+        """
+        The same m as decrypt(c, key).  The four roots are tried one after another, and the
+        first that carries the tag is taken.
+        """
+        (n, half) = (self.n, self.half)
+        mP = primes.power_mod(c, self.eP, self.p) if self.eP else primes.sqrt_mod(c, self.p)
+        mQ = primes.power_mod(c, self.eQ, self.q) if self.eQ else primes.sqrt_mod(c, self.q)
+        if mP is None or mQ is None:
+            raise ValueError("Decryption failed: the ciphertext is not a square.")
+        x = (self.cP * mQ + self.cQ * mP) % n
+        d = x - half
+        if d % 2**32 == _h:
+            return d // 2**32
+        d = n - x - half
+        if d % 2**32 == _h:
+            return d // 2**32
+        y = (self.cP * mQ - self.cQ * mP) % n
+        d = y - half
+        if d % 2**32 == _h:
+            return d // 2**32
+        d = n - y - half
+        if d % 2**32 == _h:
+            return d // 2**32
+        raise ValueError("Decryption failed: no valid square root with matching CRC tag found.")
+
+    def decrypt_many(self, cs):
+        """
+        Decrypt every c in the iterable cs, yielding the plaintexts in order.
+        """
+        for c in cs:
+            yield self.decrypt(c)
+
 import sys, getopt
 
 def main():
@@ -35,10 +35,11 @@ import primes
 
 # Generate a key (e, d, n) of a specified bit-length with optional safe primes
 
-def generate_keys(nBits, safe=True):
+def generate_keys(nBits, safe=True, workers=1):
     """
     Generates the RSA key pairs: (e, n) and (d, n)
     You have the option of using safe primes, though this is probably unnecessary.
+    With workers > 1, p and q are searched for at the same time by a pool of processes.
 
     Each of the generated primes p and q will each have approximately 1/2 of the bits.
 
@@ -52,11 +53,7 @@ def generate_keys(nBits, safe=True):
     size = nBits // 2
     low  = 2**(size - 1) # Assure the primes are each approximately half of the
     high = 2**size - 1   # bits in the modulus.
-    f = primes.safe_prime if safe else primes.random_prime
-    p = f(low, high)
-    q = f(low, high)
-    while p == q:
-        q = f(low, high)
+    (p, q) = primes.prime_pair(low, high, safe, workers=workers)
     𝝺 = primes.lcm(p - 1, q - 1) # Carmichael 𝝺(n) = lcm(𝝺(p), 𝝺(q)) = lcm(p - 1, q - 1)
     k = 16
     e = 2**k + 1             # Default public exponent
@@ -71,6 +68,22 @@ def encrypt(m, e, n): return primes.power_mod(m, e, n)
 
 def decrypt(c, d, n): return primes.power_mod(c, d, n)
 
+import bulk
+
+def encrypt_many(ms, e, n, workers=None, chunk=64):
+    """
+    m^e mod n for every m in the iterable ms, in order, on a pool that holds (e, n) (see
+    bulk.stream).
+    """
+    return bulk.stream(encrypt, (e, n), ms, workers, chunk)
+
+def decrypt_many(cs, d, n, workers=None, chunk=64):
+    """
+    c^d mod n for every c in the iterable cs, in order, on a pool that holds (d, n) (see
+    bulk.stream).
+    """
+    return bulk.stream(decrypt, (d, n), cs, workers, chunk)
+
 # The number of bytes required to hold n.
 
 def byteLength(n: int) -> int:
@@ -138,16 +151,12 @@ import crypto_io as _io
 
 # ── Extended key generation (returns p and q for PKCS#1 CRT fields) ───────────
 
-def generate_rsa_full_keys(nBits, safe=True):
+def generate_rsa_full_keys(nBits, safe=True, workers=1):
     """Like generate_keys but also returns the primes p and q."""
     size = nBits // 2
     low  = 2**(size - 1)
     high = 2**size - 1
-    f = primes.safe_prime if safe else primes.random_prime
-    p = f(low, high)
-    q = f(low, high)
-    while p == q:
-        q = f(low, high)
+    (p, q) = primes.prime_pair(low, high, safe, workers=workers)
     𝝺 = primes.lcm(p - 1, q - 1)
     k = 16
     e = 2**k + 1
@@ -158,6 +167,48 @@ def generate_rsa_full_keys(nBits, safe=True):
     n = p * q
     return (e, d, n, p, q)
 
+def generate_multiprime_keys(nBits, k=3, safe=True, workers=1):
+    """
+    Multi-prime RSA (RFC 8017): n is the product of k distinct primes r₁, ..., r_k of about
+    nBits/k bits each, and λ(n) = lcm(r₁ - 1, ..., r_k - 1).  When k does not divide nBits,
+    nBits mod k of the primes are one bit longer, so that n has exactly nBits bits.
+
+    Smaller primes are much cheaper to find (the cost of a search grows faster than the cube of
+    the size), and CRT decryption does k exponentiations of nBits/k bits instead of two of
+    nBits/2.  For security the primes must not be so small that the elliptic curve method can
+    find one: three for 2048 to 4096 bits and four from 4096 bits up are customary.
+
+    Returns (e, d, n, [r₁, ..., r_k]).
+    """
+    rs = []
+    for (size, count) in [(nBits // k + 1, nBits % k), (nBits // k, k - nBits % k)]:
+        if count == 0:
+            continue
+        (low, high) = (2**(size - 1), 2**size - 1)
+        while low < high: # Raise low until lowᵏ ⩾ 2^(k·size - 1): then the k lows of the
+            middle = (low + high) // 2 # two sizes multiply to at least 2^(nBits - 1).
+            if middle**k >= 2**(k * size - 1):
+                high = middle
+            else:
+                low = middle + 1
+        high = 2**size - 1
+        if safe: # safe_prime takes the range of q for 2q + 1.
+            (low, high) = (low // 2, (high - 1) // 2)
+        rs += primes.distinct_primes(count, low, high, safe, workers=workers)
+    𝝺 = 1
+    for r in rs:
+        𝝺 = primes.lcm(𝝺, r - 1)
+    j = 16
+    e = 2**j + 1
+    while primes.gcd(e, 𝝺) != 1:
+        j += 1
+        e = 2**j + 1
+    d = primes.inverse(e, 𝝺)
+    n = 1
+    for r in rs:
+        n *= r
+    return (e, d, n, rs)
+
 # ── RSA PKCS#1 / SPKI / PKCS#8 serialization ─────────────────────────────────
 
 def rsa_public_to_pkcs1_der(e, n):
@@ -201,13 +252,26 @@ def rsa_public_from_spki_der(der):
         return None
     return rsa_public_from_pkcs1_der(bs[1:])
 
-def rsa_private_to_pkcs1_der(e, d, n, p, q):
+# A multi-prime key (RFC 8017 §A.1.2) is version 1 and lists its primes after p and q in
+# otherPrimeInfos, a SEQUENCE of SEQUENCE { prime rᵢ, exponent d mod (rᵢ - 1), coefficient tᵢ }
+# where tᵢ = (r₁·…·rᵢ₋₁)⁻¹ mod rᵢ.  The readers return (e, d, n, p, q) for a two-prime key and
+# (e, d, n, p, q, others) for a multi-prime one, others being the list [r₃, ..., r_k].
+
+def rsa_private_to_pkcs1_der(e, d, n, p, q, others=()):
     d_p   = d % (p - 1)
     d_q   = d % (q - 1)
     q_inv = primes.inverse(q, p)
-    body  = (_io._der_integer_u8(0) + _io._der_integer(n) + _io._der_integer(e) +
+    body  = (_io._der_integer_u8(1 if others else 0) + _io._der_integer(n) + _io._der_integer(e) +
              _io._der_integer(d)    + _io._der_integer(p) + _io._der_integer(q) +
              _io._der_integer(d_p)  + _io._der_integer(d_q) + _io._der_integer(q_inv))
+    if others:
+        infos = b''
+        R = p * q
+        for r in others:
+            infos += _io._der_sequence(_io._der_integer(r) + _io._der_integer(d % (r - 1)) +
+                                       _io._der_integer(primes.inverse(R % r, r)))
+            R *= r
+        body += _io._der_sequence(infos)
     return _io._der_sequence(body)
 
 def rsa_private_from_pkcs1_der(der):
@@ -217,17 +281,33 @@ def rsa_private_from_pkcs1_der(der):
         return None
     r = _io._DerReader(seq)
     ver = r.read_small_uint()
-    if ver is None or ver != 0:
+    if ver is None or ver not in (0, 1):
         return None
     n = r.read_bigint(); e = r.read_bigint(); d = r.read_bigint()
     p = r.read_bigint(); q = r.read_bigint()
     r.read_bigint(); r.read_bigint(); r.read_bigint()  # consume CRT fields
-    if any(v is None for v in [n, e, d, p, q]) or not r.done():
+    if any(v is None for v in [n, e, d, p, q]):
         return None
-    return (e, d, n, p, q)
-
-def rsa_private_to_pkcs8_der(e, d, n, p, q):
-    pkcs1 = rsa_private_to_pkcs1_der(e, d, n, p, q)
+    if ver == 0:
+        return (e, d, n, p, q) if r.done() else None
+    infos = r.read_tlv(0x30)
+    if infos is None or not r.done():
+        return None
+    others = []
+    ri = _io._DerReader(infos)
+    while not ri.done():
+        info = ri.read_tlv(0x30)
+        if info is None:
+            return None
+        rr = _io._DerReader(info)
+        prime = rr.read_bigint(); rr.read_bigint(); rr.read_bigint()  # consume d_i, t_i
+        if prime is None or not rr.done():
+            return None
+        others.append(prime)
+    return (e, d, n, p, q, others) if others else None
+
+def rsa_private_to_pkcs8_der(e, d, n, p, q, others=()):
+    pkcs1 = rsa_private_to_pkcs1_der(e, d, n, p, q, others)
     alg   = _io._der_oid(_io._RSA_OID) + _io._der_null()
     body  = _io._der_integer_u8(0) + _io._der_sequence(alg) + _io._der_octet_string(pkcs1)
     return _io._der_sequence(body)
@@ -254,9 +334,9 @@ def rsa_public_to_pkcs1_pem(e, n):       return _io.pem_wrap("RSA PUBLIC KEY",
 def rsa_public_from_pkcs1_pem(pem):      b = _io.pem_unwrap("RSA PUBLIC KEY",  pem); return None if b is None else rsa_public_from_pkcs1_der(b)
 def rsa_public_to_spki_pem(e, n):        return _io.pem_wrap("PUBLIC KEY",       rsa_public_to_spki_der(e, n))
 def rsa_public_from_spki_pem(pem):       b = _io.pem_unwrap("PUBLIC KEY",       pem); return None if b is None else rsa_public_from_spki_der(b)
-def rsa_private_to_pkcs1_pem(e,d,n,p,q): return _io.pem_wrap("RSA PRIVATE KEY", rsa_private_to_pkcs1_der(e,d,n,p,q))
+def rsa_private_to_pkcs1_pem(e,d,n,p,q,others=()): return _io.pem_wrap("RSA PRIVATE KEY", rsa_private_to_pkcs1_der(e,d,n,p,q,others))
 def rsa_private_from_pkcs1_pem(pem):     b = _io.pem_unwrap("RSA PRIVATE KEY", pem); return None if b is None else rsa_private_from_pkcs1_der(b)
-def rsa_private_to_pkcs8_pem(e,d,n,p,q): return _io.pem_wrap("PRIVATE KEY",     rsa_private_to_pkcs8_der(e,d,n,p,q))
+def rsa_private_to_pkcs8_pem(e,d,n,p,q,others=()): return _io.pem_wrap("PRIVATE KEY",     rsa_private_to_pkcs8_der(e,d,n,p,q,others))
 def rsa_private_from_pkcs8_pem(pem):     b = _io.pem_unwrap("PRIVATE KEY",     pem); return None if b is None else rsa_private_from_pkcs8_der(b)
 
 def rsa_public_to_xml(e, n):             return _io.xml_wrap("RsaPublicKey",  [("e", e), ("n", n)])
@@ -268,6 +348,206 @@ def rsa_private_from_xml(xml):
     r = _io.xml_unwrap("RsaPrivateKey", ["e", "d", "n", "p", "q"], xml)
     return (r[0], r[1], r[2], r[3], r[4]) if r and len(r) == 5 else None
 
+# ── CRT private key ───────────────────────────────────────────────────────────
+
+class RSAPrivateKey:
+    """
+    An RSA private key that keeps p and q and decrypts by the Chinese Remainder Theorem.
+
+    Instead of one exponentiation mod n with the full d, decryption does two of half the
+    size: m₁ = c^(d_p) mod p and m₂ = c^(d_q) mod q, with d_p = d mod (p - 1) and
+    d_q = d mod (q - 1) by Fermat's little theorem.  Each costs about an eighth as much as the
+    full one (half the squarings, each a quarter of the work).  Garner's formula puts the
+    halves back together:
+        h = q⁻¹·(m₁ - m₂) mod p,   m = m₂ + h·q.
+    d_p, d_q and q⁻¹ mod p are the CRT fields of PKCS#1, computed once here.
+
+    A multi-prime key has further primes others = [r₃, ..., r_k], each with its exponent
+    dᵢ = d mod (rᵢ - 1) and coefficient tᵢ = (r₁·…·rᵢ₋₁)⁻¹ mod rᵢ; the residues mᵢ = c^(dᵢ) mod rᵢ
+    are folded in one at a time as in RFC 8017 §5.1.2.
+    """
+    def __init__(self, e, d, n, p, q, others=()):
+        (self.e, self.d, self.n, self.p, self.q) = (e, d, n, p, q)
+        self.others = list(others)
+        self.d_p   = d % (p - 1)
+        self.d_q   = d % (q - 1)
+        self.q_inv = primes.inverse(q, p)
+        self.crt   = []
+        R = p * q
+        for r in self.others:
+            self.crt.append((r, d % (r - 1), primes.inverse(R % r, r)))
+            R *= r
+
+    @classmethod
+    def generate(cls, nBits, safe=True, workers=1):
+        return cls(*generate_rsa_full_keys(nBits, safe, workers))
+
+    @classmethod
+    def generate_multiprime(cls, nBits, k=3, safe=True, workers=1):
+        (e, d, n, rs) = generate_multiprime_keys(nBits, k, safe, workers)
+        return cls(e, d, n, rs[0], rs[1], rs[2:])
+
+    @classmethod
+    def from_tuple(cls, key):
+        """
+        From (e, d, n, p, q) as returned by generate_rsa_full_keys or the private-key readers,
+        or (e, d, n, p, q, others) for a multi-prime key.
+        """
+        return cls(*key)
+
+    from_pkcs1_der = _io.key_reader(rsa_private_from_pkcs1_der)
+    from_pkcs1_pem = _io.key_reader(rsa_private_from_pkcs1_pem)
+    from_pkcs8_der = _io.key_reader(rsa_private_from_pkcs8_der)
+    from_pkcs8_pem = _io.key_reader(rsa_private_from_pkcs8_pem)
+
+    def to_tuple(self):
+        key = (self.e, self.d, self.n, self.p, self.q)
+        return key + (self.others,) if self.others else key
+
+    def to_pkcs1_der(self):        return rsa_private_to_pkcs1_der(*self.to_tuple())
+    def to_pkcs1_pem(self):        return rsa_private_to_pkcs1_pem(*self.to_tuple())
+    def to_pkcs8_der(self):        return rsa_private_to_pkcs8_der(*self.to_tuple())
+    def to_pkcs8_pem(self):        return rsa_private_to_pkcs8_pem(*self.to_tuple())
+
+    def public_key(self):          return (self.e, self.n)
+
+    def decrypt(self, c):
+        """
+        The same m as decrypt(c, d, n), by two half-size exponentiations (k of size n/k for a
+        multi-prime key) and Garner's formula.
+        """
+        m_1 = primes.power_mod(c % self.p, self.d_p, self.p)
+        m_2 = primes.power_mod(c % self.q, self.d_q, self.q)
+        h   = (self.q_inv * (m_1 - m_2)) % self.p
+        m   = m_2 + h * self.q
+        R   = self.p * self.q
+        for (r, d_r, t) in self.crt:
+            m_r = primes.power_mod(c % r, d_r, r)
+            m  += R * ((t * (m_r - m)) % r)
+            R  *= r
+        return m
+
+# ── Fiat's batch RSA ──────────────────────────────────────────────────────────
+
+def generate_batch_keys(nBits, count, safe=True, workers=1):
+    """
+    Generate count sibling RSA keys that share one modulus n but have distinct small public
+    exponents: the smallest odd primes e₁, e₂, ... that are prime to λ(n).  They are pairwise
+    coprime, which batch decryption needs.  Small exponents are only safe with padding; like the
+    rest of this module, these keys are textbook RSA.
+
+    Returns (RSAPrivateKey for n, [(e₁, d₁), ..., (e_count, d_count)]).
+    """
+    (e, d, n, p, q) = generate_rsa_full_keys(nBits, safe, workers)
+    𝝺 = primes.lcm(p - 1, q - 1)
+    siblings = []
+    e_i = 3
+    while len(siblings) < count:
+        if primes.is_prime(e_i) and primes.gcd(e_i, 𝝺) == 1:
+            siblings.append((e_i, primes.inverse(e_i, 𝝺)))
+        e_i += 2
+    return (RSAPrivateKey(e, d, n, p, q), siblings)
+
+class BatchDecryptor:
+    """
+    Fiat's batch RSA: decrypt b ciphertexts cᵢ = mᵢ^(eᵢ) mod n, one under each of b pairwise
+    coprime exponents, with a single full-size exponentiation.
+
+    A binary tree is built over the exponents; the node for a set S of them has E_S = ∏ eᵢ.
+    Going up, each node combines its children's values as v_S = v_L^(E_R) · v_R^(E_L), so that
+        v_S = ∏ cᵢ^(E_S/eᵢ) = M_S^(E_S),  where M_S = ∏ mᵢ  (i ∈ S).
+    At the root one E-th root, v^(E⁻¹ mod λ) taken by CRT, gives M, the product of all the
+    plaintexts.  Going down, M_S is split using X ≡ 1 (mod E_L), X ≡ 0 (mod E_R):
+        M_S^X = M_L · v_L^((X-1)/E_L) · v_R^(X/E_R),   so   M_L = M_S^X / (v_L^... · v_R^...)
+    and M_R = M_S / M_L.  Every exponent on the way up and down is small, so the whole batch
+    costs little more than the one root.
+    """
+    def __init__(self, key, es):
+        """
+        key is the RSAPrivateKey of the shared modulus n; es the distinct exponents, in the
+        order in which decrypt will be given the ciphertexts.
+        """
+        self.key = key
+        self.es  = list(es)
+        if not self.es:
+            raise ValueError("BatchDecryptor needs at least one exponent")
+        if len(set(self.es)) < len(self.es):
+            raise ValueError("BatchDecryptor needs distinct exponents")
+        self.tree = self._build(0, len(self.es))
+        E = self.tree[0]
+        𝝺 = primes.lcm(key.p - 1, key.q - 1)
+        self.root = RSAPrivateKey(E, primes.inverse(E, 𝝺), key.n, key.p, key.q)
+        self.keys = [RSAPrivateKey(e, primes.inverse(e, 𝝺), key.n, key.p, key.q)
+                     for e in self.es] # For batches that cannot be split.
+
+    def _build(self, lo, hi):
+        """
+        The node (E, children) for es[lo:hi]; an inner node's children are (left, right, a, b)
+        with a = (X - 1)/E_L and b = X/E_R.
+        """
+        if hi - lo == 1:
+            return (self.es[lo], None)
+        mid   = (lo + hi) // 2
+        left  = self._build(lo, mid)
+        right = self._build(mid, hi)
+        (E_L, E_R) = (left[0], right[0])
+        X = E_R * primes.inverse(E_R % E_L, E_L)
+        return (E_L * E_R, (left, right, (X - 1) // E_L, X // E_R))
+
+    def _up(self, node, cs, lo):
+        """
+        Returns (v, values) where values holds v for every node below, in preorder.
+        """
+        (E, children) = node
+        if children is None:
+            return (cs[lo] % self.key.n, [])
+        (left, right, _, _) = children
+        (v_L, below_L) = self._up(left, cs, lo)
+        (v_R, below_R) = self._up(right, cs, lo + self._leaves(left))
+        n = self.key.n
+        v = (primes.power_mod(v_L, right[0], n) * primes.power_mod(v_R, left[0], n)) % n
+        return (v, [(v_L, below_L), (v_R, below_R)])
+
+    def _leaves(self, node):
+        return 1 if node[1] is None else self._leaves(node[1][0]) + self._leaves(node[1][1])
+
+    def _down(self, node, M, values, out):
+        """
+        Split M into the plaintexts below node, appending them to out.  Returns False if a
+        divisor is not invertible mod n (a plaintext is 0 or shares a factor with n).
+        """
+        (E, children) = node
+        if children is None:
+            out.append(M)
+            return True
+        (left, right, a, b) = children
+        ((v_L, below_L), (v_R, below_R)) = values
+        n = self.key.n
+        X = a * left[0] + 1
+        mask = (primes.power_mod(v_L, a, n) * primes.power_mod(v_R, b, n)) % n
+        mask_inv = primes.inverse(mask, n)
+        if mask_inv is None:
+            return False
+        M_L = (primes.power_mod(M, X, n) * mask_inv) % n
+        M_L_inv = primes.inverse(M_L, n)
+        if M_L_inv is None:
+            return False
+        M_R = (M * M_L_inv) % n
+        return self._down(left, M_L, below_L, out) and self._down(right, M_R, below_R, out)
+
+    def decrypt(self, cs):
+        """
+        Decrypt cs, where cs[i] was encrypted under es[i].
+        """
+        if len(cs) != len(self.es):
+            raise ValueError(f"BatchDecryptor expects {len(self.es)} ciphertexts, got {len(cs)}")
+        (v, values) = self._up(self.tree, cs, 0)
+        M = self.root.decrypt(v)
+        out = []
+        if not self._down(self.tree, M, values, out): # Decrypt one by one, still by CRT.
+            return [k.decrypt(c) for (k, c) in zip(self.keys, cs)]
+        return out
+
 import getopt, sys
 
 def main():
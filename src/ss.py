@@ -31,7 +31,7 @@ import primes
 
 from random import randrange as uniform
 
-def generate_keys(nBits, safe=True):
+def generate_keys(nBits, safe=True, workers=1):
     """
     Generate a Schmidt-Samoa key pair whose modulus n = p²q has nBits of strength.
 
@@ -48,6 +48,8 @@ def generate_keys(nBits, safe=True):
     Why d = n⁻¹ mod λ(n)?  A CRT argument over the factorisation n = p²q shows
     that m^(nd) ≡ m (mod p) and m^(nd) ≡ m (mod q), so c^d mod γ = m.
 
+    With workers > 1, p and q are searched for at the same time by a pool of processes.
+
     Public key:  n
     Private key: (d, γ)
     """
@@ -55,11 +57,10 @@ def generate_keys(nBits, safe=True):
     low  = 2**(size - 1) # Assure the primes are each approximately half of the
     high = 2**size - 1   # bits in the modulus.
     f = primes.safe_prime if safe else primes.random_prime
-    p = f(low, high)
-    q = f(low, high)
+    (p, q) = primes.prime_pair(low, high, safe, workers=workers)
     # Reject q if it would make n non-invertible mod λ(n).
     while p == q or (q - 1) % p == 0 or (p - 1) % q == 0:
-        q = f(low, high)
+        q = f(low, high, workers=workers)
     𝛄 = p * q
     𝝺 = primes.lcm(p - 1, q - 1) # Carmichael λ(n) = lcm(p-1, q-1)
     n = p * p * q
@@ -87,6 +88,29 @@ def decrypt(c, key):
     d, 𝛄 = key
     return primes.power_mod(c, d, 𝛄)
 
+def encryptor(n):
+    """
+    The key-bound Schmidt-Samoa encryptor for n: pow(m) applies the public map m^n mod n from a
+    recoding of n kept across calls, and pow_many applies it to a batch.
+    """
+    return primes.fixed_exponent(n, n)
+
+import bulk
+
+def encrypt_many(ms, n, workers=None, chunk=64):
+    """
+    The Schmidt-Samoa public map m^n mod n for every m in the iterable ms, in order (see
+    bulk.stream); each worker recodes n once, through primes.fixed_power.
+    """
+    return bulk.stream(primes.fixed_power, (n, n), ms, workers, chunk)
+
+def decrypt_many(cs, key, workers=None, chunk=64):
+    """
+    c^d mod γ for every c in the iterable cs, in order, on workers that hold (d, γ) (see
+    bulk.stream).
+    """
+    return bulk.stream(decrypt, (key,), cs, workers, chunk)
+
 import crypto_io as _io
 
 # ── Serialization ─────────────────────────────────────────────────────────────
@@ -117,6 +141,84 @@ def ss_private_from_xml(xml):
     r = _io.xml_unwrap("SchmidtSamoaPrivateKey", ["d", "gamma"], xml)
     return (r[0], r[1]) if r and len(r) == 2 else None
 
+def ss_private_crt_to_blob(d, γ, p, q):
+    return _io.encode_big_ints([d, γ, p, q, d % (p - 1), d % (q - 1), primes.inverse(q, p)])
+def ss_private_crt_from_blob(blob):
+    r = _io.decode_big_ints(blob)
+    return (r[0], r[1], r[2], r[3]) if r and len(r) == 7 else None
+def ss_private_crt_to_pem(d, γ, p, q):
+    return _io.pem_wrap("CRYPTOGRAPHY SCHMIDT-SAMOA CRT PRIVATE KEY", ss_private_crt_to_blob(d, γ, p, q))
+def ss_private_crt_from_pem(pem):
+    b = _io.pem_unwrap("CRYPTOGRAPHY SCHMIDT-SAMOA CRT PRIVATE KEY", pem)
+    return None if b is None else ss_private_crt_from_blob(b)
+def ss_private_crt_to_xml(d, γ, p, q):
+    return _io.xml_wrap("SchmidtSamoaCrtPrivateKey", [("d", d), ("gamma", γ), ("p", p), ("q", q),
+                        ("dp", d % (p - 1)), ("dq", d % (q - 1)), ("qinv", primes.inverse(q, p))])
+def ss_private_crt_from_xml(xml):
+    r = _io.xml_unwrap("SchmidtSamoaCrtPrivateKey", ["d", "gamma", "p", "q", "dp", "dq", "qinv"], xml)
+    return (r[0], r[1], r[2], r[3]) if r and len(r) == 7 else None
+
+# ── CRT private key ───────────────────────────────────────────────────────────
+
+class SSPrivateKey:
+    """
+    A Schmidt-Samoa private key that keeps p and q and decrypts by the Chinese Remainder
+    Theorem, as rsa.RSAPrivateKey does: m_p = c^(d_p) mod p and m_q = c^(d_q) mod q with
+    d_p = d mod (p - 1) and d_q = d mod (q - 1), put together by Garner's formula.  Two
+    half-size exponentiations cost about a quarter of one c^d mod γ.
+
+    The two-field (d, γ) key does not hold p and q, but the public key does: p = n/γ and
+    q = γ/p.  So the key reads and writes the existing blob, given n, as well as its own CRT
+    form [d, γ, p, q, d_p, d_q, q⁻¹ mod p].
+    """
+    def __init__(self, d, γ, p, q):
+        (self.d, self.γ, self.p, self.q) = (d, γ, p, q)
+        self.d_p   = d % (p - 1)
+        self.d_q   = d % (q - 1)
+        self.q_inv = primes.inverse(q, p)
+
+    @classmethod
+    def generate(cls, nBits, safe=True, workers=1):
+        (n, key) = generate_keys(nBits, safe, workers)
+        return cls.from_tuple(key, n)
+
+    @classmethod
+    def from_tuple(cls, key, n=None):
+        """
+        From (d, γ, p, q) as the CRT readers return it, or from (d, γ) and the public n, which
+        gives p = n/γ and q = γ/p.
+        """
+        if len(key) == 4:
+            return cls(*key)
+        (d, γ) = key
+        p = n // γ
+        return cls(d, γ, p, γ // p)
+
+    from_blob     = _io.key_reader(ss_private_from_blob)     # (blob, n)
+    from_pem      = _io.key_reader(ss_private_from_pem)      # (pem, n)
+    from_xml      = _io.key_reader(ss_private_from_xml)      # (xml, n)
+    from_crt_blob = _io.key_reader(ss_private_crt_from_blob)
+    from_crt_pem  = _io.key_reader(ss_private_crt_from_pem)
+    from_crt_xml  = _io.key_reader(ss_private_crt_from_xml)
+
+    def to_tuple(self):                 return (self.d, self.γ)
+    def to_blob(self):                  return ss_private_to_blob(self.d, self.γ)
+    def to_pem(self):                   return ss_private_to_pem(self.d, self.γ)
+    def to_xml(self):                   return ss_private_to_xml(self.d, self.γ)
+    def to_crt_blob(self):              return ss_private_crt_to_blob(self.d, self.γ, self.p, self.q)
+    def to_crt_pem(self):               return ss_private_crt_to_pem(self.d, self.γ, self.p, self.q)
+    def to_crt_xml(self):               return ss_private_crt_to_xml(self.d, self.γ, self.p, self.q)
+
+    def public_key(self):               return self.p * self.γ
+
+    def decrypt(self, c):
+        """
+        The same m as decrypt(c, key), by two half-size exponentiations and Garner's formula.
+        """
+        m_p = primes.power_mod(c % self.p, self.d_p, self.p)
+        m_q = primes.power_mod(c % self.q, self.d_q, self.q)
+        return m_q + self.q * ((self.q_inv * (m_p - m_q)) % self.p)
+
 import sys, getopt
 
 def main():
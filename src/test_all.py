@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 import random
+import itertools
 random.seed(42)
 
 passed = 0
@@ -33,6 +34,28 @@ check("is_prime(97)",  primes.is_prime(97),  True)
 check("is_prime(100)", primes.is_prime(100), False)
 check("is_prime(561)", primes.is_prime(561), False)  # Carmichael number
 
+for policy in ["rounds", "bpsw", "mr"]:
+    check(f"is_prime policy {policy}: primes below 100",
+          [n for n in range(100) if primes.is_prime(n, policy=policy)], primes.small_primes(100))
+    check(f"is_prime policy {policy}: 2**89 - 1 prime", primes.is_prime(2**89 - 1, policy=policy), True)
+    check(f"is_prime policy {policy}: 3215031751 composite", primes.is_prime(3215031751, policy=policy), False)
+check("mr_bases(2**64 - 1) is the first twelve primes", primes.mr_bases(2**64 - 1), primes.small_primes(38))
+check("mr_bases beyond the last bound", primes.mr_bases(2**82), None)
+check("is_prime_MR deterministic below the bounds (k = 0)", primes.is_prime_MR(2**61 - 1, 0), True)
+check("is_prime_MR rejects the strong pseudoprime 3825123056546413051",
+      primes.is_prime_MR(3825123056546413051, 0), False)
+
+previous = primes.set_primality_policy("rounds")
+check("set_primality_policy returns the previous policy", previous, "bpsw")
+check("is_prime under the rounds policy", primes.is_prime(2**61 - 1), True)
+primes.set_primality_policy(previous)
+
+check("strong Lucas pseudoprimes below 20000 (Selfridge parameters)",
+      [n for n in range(3, 20000, 2) if primes.is_prime_LS(n) and not primes.is_prime_MR(n)],
+      [5459, 5777, 10877, 16109, 18971])
+check("compute_UV(10, 1000003, 1, 5) (Fibonacci, Lucas numbers)", primes.compute_UV(10, 1000003, 1, 5), (55, 123))
+check("is_prime_LS(2**4423 - 1) without recursion", primes.is_prime_LS(2**4423 - 1), True)
+
 check("gcd(12,8)",  primes.gcd(12, 8),  4)
 check("gcd(35,14)", primes.gcd(35, 14), 7)
 check("lcm(4,6)",   primes.lcm(4, 6),   12)
@@ -41,11 +64,77 @@ inv7_11 = primes.inverse(7, 11)
 check("inverse(7,11) exists",   inv7_11 is not None,       True)
 check("7 * inverse(7,11) ≡ 1", (7 * inv7_11) % 11 == 1,   True)
 
+for mode in primes.POWER_MODES:
+    check(f"power_mod mode {mode}", primes.power_mod(7, 2**200 + 2**77 + 1, 2**127 - 1, mode), pow(7, 2**200 + 2**77 + 1, 2**127 - 1))
+check("sliding_recode(0b1011000111, 3)", primes.sliding_recode(0b1011000111, 3), [(3, 5), (1, 1), (6, 7)])
+check("kary_recode(0b1011000111, 3)", primes.kary_recode(0b1011000111, 3), [(3, 1), (3, 3), (3, 0), (3, 7)])
+previous = primes.set_power_mode("native")
+check("set_power_mode returns the previous mode", previous, "sliding")
+primes.set_power_mode(previous)
+
 check("encode/decode roundtrip", primes.decode(primes.encode("Hello")), "Hello")
 
 r = primes.random_prime(2**31, 2**32 - 1)
 check("random_prime is prime", primes.is_prime(r), True)
 
+check("small_primes(30)", primes.small_primes(30), [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+check("sieve_window keeps 3, 5, 7 and strikes 9", primes.sieve_window(3, 4), [0, 1, 2])
+g = primes.prime_search(1000, 1100)
+found = {next(g) for _ in range(40)}
+check("prime_search covers primes in [1000, 1100]", found, {p for p in range(1000, 1101) if primes.is_prime(p)})
+
+s = primes.safe_prime(2**31, 2**32 - 1)
+check("safe_prime is prime", primes.is_prime(s), True)
+check("safe_prime is 2q + 1 with q prime", primes.is_prime((s - 1) // 2), True)
+
+random.seed(2021)
+r1 = primes.random_prime(2**127, 2**128 - 1)
+random.seed(2021)
+r2 = primes.random_prime(2**127, 2**128 - 1, workers=2)
+check("random_prime(workers=2) finds the serial prime", r2, r1)
+(p2, q2) = primes.prime_pair(2**63, 2**64 - 1, workers=2)
+check("prime_pair(workers=2) is two distinct primes", (primes.is_prime(p2), primes.is_prime(q2), p2 != q2), (True, True, True))
+
+check("multi_power_mod", primes.multi_power_mod([3, 5, 7], [100, 0, 2**70 + 1], 10**9 + 7),
+      (pow(3, 100, 10**9 + 7) * pow(7, 2**70 + 1, 10**9 + 7)) % (10**9 + 7))
+check("multi_power_mod of nothing", primes.multi_power_mod([], [], 15), 1)
+
+check("FixedExponent", primes.FixedExponent(2**521 - 1, 10**40 + 9).pow(12345), pow(12345, 2**521 - 1, 10**40 + 9))
+check("fixed_power keeps one FixedExponent per (e, n)", (primes.fixed_power(7, 65537, 10**40 + 9), primes.fixed_exponent(65537, 10**40 + 9) is primes.fixed_exponent(65537, 10**40 + 9)), (pow(7, 65537, 10**40 + 9), True))
+
+p_sq = 998244353 # 119·2²³ + 1: Cipolla
+for p_s in [10007, 10037, 10009, 40961, p_sq, 2**127 - 1]: # 3 mod 4, 5 mod 8, Tonelli-Shanks (twice), Cipolla, 3 mod 4
+    check(f"sqrt_mod {p_s}", all(primes.sqrt_mod(a * a, p_s) in (a % p_s, -a % p_s) for a in [2, 3, 12345, p_s - 1]), True)
+check("sqrt_mod of a non-residue", primes.sqrt_mod(3, 40961), None)
+check("prime_search in a residue class", all(p_s % 12 == 7 for p_s in itertools.islice(primes.prime_search(2**40, 2**41, residue=7, step=12), 5)), True)
+check("rabin_prime ≡ 3 (mod 4)", primes.rabin_prime(2**60, 2**61, False) % 4, 3)
+
+# ─── factor.py ────────────────────────────────────────────────────────────────
+print("\n=== factor.py ===")
+import factor
+
+n_f60 = 1000000007 * 998244353
+for engine in factor.RHO_ENGINES:
+    check(f"factor by {engine}", sorted(factor.factor(n_f60 * 3**4 * 101, engine=engine)), [3, 3, 3, 3, 101, 998244353, 1000000007])
+factor.reset_counts()
+r_f = factor.rho(n_f60, "brent")
+counts_f = factor.reset_counts()
+check("Brent rho finds a factor", r_f in (998244353, 1000000007), True)
+check("Brent rho batches its gcds", counts_f["gcds"] < counts_f["iterations"] // 10, True)
+# A deadline already past: a factor found by the first block must still be returned.
+late = [factor.rho_brent(15, deadline=1e-9) for _ in range(64)]
+check("Brent rho keeps a factor found as the deadline passes", (set(late) <= {None, 3, 5}, 3 in late or 5 in late), (True, True))
+
+check("factor stages: trial division", sorted(factor.factor_stages(3**4 * 101 * 9973)), [(3, "trial")] * 4 + [(101, "trial"), (9973, "trial")])
+check("factor stages: perfect power", factor.factor_stages((2**61 - 1)**3), [(2**61 - 1, "power")] * 3)
+p_sm = 8317173629230537732491119     # p - 1 is 500-smooth
+p_sf = 1246246707691165797105443     # A safe prime: p - 1 = 2q
+check("factor stages: Pollard p - 1", sorted(factor.factor_stages(p_sm * p_sf, {"rho": 0})), [(p_sf, "pm1"), (p_sm, "pm1")])
+n_ec = 1768875827 * 1255903787       # Two safe primes
+check("factor stages: ECM", sorted(factor.factor_stages(n_ec, {"rho": 0, "pm1": 0})), [(1255903787, "ecm"), (1768875827, "ecm")])
+check("factor stages: out of budget", factor.factor_stages(n_ec, {"rho": 0, "pm1": 0, "ecm": 0}), [(n_ec, None)])
+check("factor stages: a prime", factor.factor_stages(p_sf), [(p_sf, None)])
+
 # ─── rsa.py ───────────────────────────────────────────────────────────────────
 print("\n=== rsa.py ===")
 import rsa
@@ -57,6 +146,9 @@ for msg in ["Hello", "Test", "RSA works"]:
     t = primes.decode(rsa.decrypt(c, d, n))
     check(f'RSA roundtrip "{msg}"', t, msg)
 
+(e_w, d_w, n_w) = rsa.generate_keys(256, False, workers=2)
+check("RSA roundtrip with keys from 2 workers", rsa.decrypt(rsa.encrypt(12345, e_w, n_w), d_w, n_w), 12345)
+
 ks = rsa.publicKeyToStr(e, n)
 (e2, n2) = rsa.publicKeyFromStr(ks)
 check("RSA SSH key roundtrip e", e2, e)
@@ -73,6 +165,19 @@ for msg in ["Hello", "ElGamal"]:
     t = primes.decode(elgamal.decrypt(c, prv))
     check(f'ElGamal roundtrip "{msg}"', t, msg)
 
+enc = elgamal.encryptor(pub)
+check("ElGamal encryptor is cached per key", elgamal.encryptor(pub) is enc, True)
+for msg in ["Hello", "ElGamal"]:
+    t = primes.decode(elgamal.decrypt(enc.encrypt(primes.encode(msg)), prv))
+    check(f'ElGamal fixed-base roundtrip "{msg}"', t, msg)
+
+with elgamal.PooledEncryptor(pub, 2, 8) as pooled:
+    cs = [pooled.encrypt(m) for m in range(1, 21)]
+    check("ElGamal pooled roundtrip", [elgamal.decrypt(c, prv) for c in cs], list(range(1, 21)))
+    check("ElGamal pooled pairs are used once", len({𝛾 for (𝛾, _) in cs}), 20)
+    stats = pooled.metrics()
+    check("ElGamal pool counts every encryption", stats["hits"] + stats["misses"], 20)
+
 # ─── rabin.py ─────────────────────────────────────────────────────────────────
 print("\n=== rabin.py ===")
 import rabin
@@ -84,6 +189,17 @@ for msg in ["Hello", "Rabin"]:
     t = primes.decode(rabin.decrypt(c, k_r))
     check(f'Rabin roundtrip "{msg}"', t, msg)
 
+key_r = rabin.RabinPrivateKey(*k_r)
+cs_r = [rabin.encrypt(m, n_r) for m in range(1000, 1050)]
+check("Rabin private key decrypt", key_r.decrypt(cs_r[0]), rabin.decrypt(cs_r[0], k_r))
+check("Rabin private key decrypt_many", list(key_r.decrypt_many(iter(cs_r))), list(range(1000, 1050)))
+check("Rabin private key from PEM", rabin.RabinPrivateKey.from_pem(key_r.to_pem()).to_tuple(), k_r)
+check("Rabin private key from bad XML", rabin.RabinPrivateKey.from_xml("<junk/>"), None)
+(p_r1, q_r1) = (next(primes.prime_search(2**80, 2**81, residue=1, step=8)), next(primes.prime_search(2**80, 2**81, residue=5, step=8)))
+c_r1 = rabin.encrypt(primes.encode("any prime"), p_r1 * q_r1)
+check("Rabin decrypt with p, q ≡ 1 (mod 4)", primes.decode(rabin.decrypt(c_r1, (p_r1, q_r1))), "any prime")
+check("Rabin private key with p, q ≡ 1 (mod 4)", primes.decode(rabin.RabinPrivateKey(p_r1, q_r1).decrypt(c_r1)), "any prime")
+
 # ─── paillier.py ──────────────────────────────────────────────────────────────
 print("\n=== paillier.py ===")
 import paillier
@@ -103,6 +219,56 @@ c_sum = (c1 * c2) % (n_h ** 2)
 d_sum = paillier.decrypt(c_sum, prv_p)
 check("Paillier homomorphic: E(7)*E(13) decrypts to 20", d_sum, m1 + m2)
 
+check("Paillier ζ^m by 1 + mn", paillier.zeta_power(m1, pub_p), primes.power_mod(n_h + 1, m1, n_h ** 2))
+with paillier.PooledEncryptor(pub_p, 2, 8) as pooled_p:
+    cs_p = [pooled_p.encrypt(m) for m in range(20)]
+    check("Paillier pooled roundtrip", [paillier.decrypt(c, prv_p) for c in cs_p], list(range(20)))
+    check("Paillier pooled nonces are used once", len(set(cs_p)), 20)
+    stats = pooled_p.metrics()
+    check("Paillier pool counts every encryption", stats["hits"] + stats["misses"], 20)
+
+ms_a = list(range(1, 301))
+cs_a = [paillier.encrypt(m, pub_p) for m in ms_a]
+check("Paillier add", paillier.decrypt(paillier.add(c1, c2, pub_p), prv_p), m1 + m2)
+check("Paillier add_plain", paillier.decrypt(paillier.add_plain(c1, 100, pub_p), prv_p), m1 + 100)
+check("Paillier mul_plain", paillier.decrypt(paillier.mul_plain(c1, -3, pub_p), prv_p), (-3 * m1) % n_h)
+check("Paillier add_many", paillier.decrypt(paillier.add_many(iter(cs_a), pub_p, chunk=64), prv_p), sum(ms_a))
+check("Paillier add_many on 2 workers", paillier.decrypt(paillier.add_many(iter(cs_a), pub_p, 2, 64), prv_p), sum(ms_a))
+check("Paillier add_many of nothing", paillier.decrypt(paillier.add_many([], pub_p), prv_p), 0)
+check("Paillier dot", paillier.decrypt(paillier.dot(iter(cs_a), iter(ms_a), pub_p, chunk=50), prv_p), sum(m * m for m in ms_a))
+check("Paillier dot on 2 workers", paillier.decrypt(paillier.dot(cs_a, ms_a, pub_p, 2), prv_p), sum(m * m for m in ms_a))
+
+codec = paillier.SlotCodec(n_h, 12, 8, signed=True)
+rows = [[(7 * i + j) % 4096 - 2048 for j in range(codec.count)] for i in range(50)]
+c_rows = paillier.add_many((codec.encrypt(r, pub_p) for r in rows), pub_p)
+check("Paillier slots fit below n/2", codec.count, (n_h.bit_length() - 1) // 20)
+check("Paillier signed slots add slot-wise", codec.decrypt(c_rows, prv_p), [sum(col) for col in zip(*rows)])
+codec_u = paillier.SlotCodec(n_h, 8, 4)
+check("Paillier unsigned slots", codec_u.decrypt(paillier.add(codec_u.encrypt([255, 1], pub_p), codec_u.encrypt([255, 2], pub_p), pub_p), prv_p, 3), [510, 3, 0])
+try:
+    codec_u.encode([256]); raised = False
+except ValueError:
+    raised = True
+check("Paillier slot out of range raises ValueError", raised, True)
+
+check("Damgård–Jurik (1+n)^m by the binomial series", paillier.dj_power(n_h**2 + 5, n_h, 3), primes.power_mod(n_h + 1, n_h**2 + 5, n_h**4))
+for s_dj in (1, 2, 3):
+    m_dj = n_h**s_dj - 12345
+    c_dj = paillier.dj_encrypt(m_dj, pub_p, s_dj)
+    check(f"Damgård–Jurik s = {s_dj} roundtrip", paillier.dj_decrypt(c_dj, prv_p, s_dj), m_dj)
+    c_dj = paillier.dj_add(c_dj, paillier.dj_encrypt(20000, pub_p, s_dj), pub_p, s_dj)
+    check(f"Damgård–Jurik s = {s_dj} homomorphic add", paillier.dj_decrypt(c_dj, prv_p, s_dj), 20000 - 12345)
+check("Damgård–Jurik s = 1 is Paillier", paillier.decrypt(paillier.dj_encrypt(m1, pub_p, 1), prv_p), m1)
+
+key_p = paillier.PaillierPrivateKey.from_tuple(prv_p)
+check("Paillier modulus split from λ", key_p.p * key_p.q, n_h)
+check("Paillier CRT key writes the same blob", key_p.to_blob(), paillier.paillier_private_to_blob(*prv_p))
+check("Paillier CRT decrypt", [key_p.decrypt(c) for c in (c1, c2, c_sum)], [m1, m2, m1 + m2])
+check("Paillier CRT key from PEM", paillier.PaillierPrivateKey.from_pem(key_p.to_pem()).decrypt(c_sum), m1 + m2)
+check("Paillier CRT key from bad PEM", paillier.PaillierPrivateKey.from_pem("junk"), None)
+key_g = paillier.PaillierPrivateKey.generate(256, False)
+check("Paillier CRT key generated with its primes", key_g.decrypt(paillier.encrypt(m1, (key_g.n, key_g.𝜻))), m1)
+
 # ─── ss.py (Schmidt-Samoa) ────────────────────────────────────────────────────
 print("\n=== ss.py (Schmidt-Samoa) ===")
 import ss
@@ -114,6 +280,10 @@ for msg in ["Hello", "Schmidt-Samoa"]:
     t = primes.decode(ss.decrypt(c, de_ss))
     check(f'Schmidt-Samoa roundtrip "{msg}"', t, msg)
 
+enc_ss = ss.encryptor(en_ss)
+check("Schmidt-Samoa encryptor is cached per key", ss.encryptor(en_ss) is enc_ss, True)
+check("Schmidt-Samoa recoded encrypt", list(enc_ss.pow_many(range(2, 40))), [ss.encrypt(m, en_ss) for m in range(2, 40)])
+
 # ─── cocks.py ─────────────────────────────────────────────────────────────────
 print("\n=== cocks.py ===")
 import cocks
@@ -125,6 +295,37 @@ for msg in ["Hi", "Cocks"]:
     t = primes.decode(cocks.decrypt(c, de_c))
     check(f'Cocks roundtrip "{msg}"', t, msg)
 
+enc_c = cocks.encryptor(en_c)
+check("Cocks encryptor is cached per key", cocks.encryptor(en_c) is enc_c, True)
+check("Cocks recoded encrypt", list(enc_c.pow_many(range(2, 40))), [cocks.encrypt(m, en_c) for m in range(2, 40)])
+
+# ─── bulk.py ──────────────────────────────────────────────────────────────────
+print("\n=== bulk.py ===")
+import bulk
+
+ms_k = list(range(2, 200))
+check("bulk stream keeps order", list(bulk.stream(primes.power_mod, (3, 1009), iter(ms_k), 2, 7)),
+      [primes.power_mod(m, 3, 1009) for m in ms_k])
+check("bulk stream is lazy", next(bulk.stream(primes.power_mod, (3, 1009), iter(range(2, 10**9)), 2)), 8)
+check("RSA bulk roundtrip", list(rsa.decrypt_many(rsa.encrypt_many(ms_k, e, n, 2, 16), d, n, 2)), ms_k)
+check("ElGamal bulk roundtrip", list(elgamal.decrypt_many(elgamal.encrypt_many(ms_k, pub, 2, 16), prv, 2)), ms_k)
+check("Rabin bulk roundtrip", list(rabin.decrypt_many(rabin.encrypt_many(ms_k, n_r, 2, 16), k_r, 2)), ms_k)
+check("Paillier bulk roundtrip", list(paillier.decrypt_many(paillier.encrypt_many(ms_k, pub_p, 2, 16), prv_p, 2)), ms_k)
+check("Schmidt-Samoa bulk roundtrip", list(ss.decrypt_many(ss.encrypt_many(ms_k, en_ss, 2, 16), de_ss, 2)), ms_k)
+check("Cocks bulk roundtrip", list(cocks.decrypt_many(cocks.encrypt_many(ms_k, en_c, 2, 16), de_c, 2)), ms_k)
+check("bulk keeps a bounded number of pools", len(bulk._pools) <= bulk.KEPT, True)
+
+live = [bulk.stream(primes.power_mod, (3, p), iter(ms_k), 2, 4) for p in [1009, 1013, 1019, 1021, 1031, 1033]]
+interleaved = [[] for _ in live]
+for _ in ms_k:
+    for (out, st) in zip(interleaved, live):
+        out.append(next(st))
+check("bulk interleaves more than KEPT live streams", interleaved,
+      [[primes.power_mod(m, 3, p) for m in ms_k] for p in [1009, 1013, 1019, 1021, 1031, 1033]])
+for st in live:
+    st.close()
+check("bulk trims idle pools after the streams end", (len(bulk._pools) <= bulk.KEPT, bulk._users), (True, {}))
+
 # ─── RSA serialization ────────────────────────────────────────────────────────
 print("\n=== rsa.py serialization ===")
 
@@ -160,6 +361,43 @@ check("RSA private XML roundtrip e", got_xml[0], e_f)
 check("RSA private XML roundtrip d", got_xml[1], d_f)
 check("RSA private XML roundtrip n", got_xml[2], n_f)
 
+key_crt = rsa.RSAPrivateKey(e_f, d_f, n_f, p_f, q_f)
+c_crt = rsa.encrypt(primes.encode("CRT"), e_f, n_f)
+check("RSA CRT decrypt", primes.decode(key_crt.decrypt(c_crt)), "CRT")
+check("RSA CRT decrypt agrees with decrypt", key_crt.decrypt(c_crt), rsa.decrypt(c_crt, d_f, n_f))
+check("RSAPrivateKey from PKCS#1 DER", rsa.RSAPrivateKey.from_pkcs1_der(pkcs1_prv).decrypt(c_crt), key_crt.decrypt(c_crt))
+check("RSAPrivateKey from PKCS#8 PEM", rsa.RSAPrivateKey.from_pkcs8_pem(key_crt.to_pkcs8_pem()).to_tuple(), key_crt.to_tuple())
+check("RSAPrivateKey from bad DER", rsa.RSAPrivateKey.from_pkcs1_der(b"junk"), None)
+
+(e_m, d_m, n_m, rs_m) = rsa.generate_multiprime_keys(384, 3, False)
+check("RSA multi-prime n is the product of 3 distinct primes", (len(set(rs_m)), rs_m[0] * rs_m[1] * rs_m[2] == n_m), (3, True))
+check("RSA multi-prime n has every bit", n_m.bit_length(), 384)
+check("RSA multi-prime n has every bit when k does not divide nBits",
+      [rsa.generate_multiprime_keys(b, 3, False)[2].bit_length() for b in (385, 386)], [385, 386])
+check("RSA multi-prime safe primes give every bit", rsa.generate_multiprime_keys(200, 3, True)[2].bit_length(), 200)
+key_mp = rsa.RSAPrivateKey(e_m, d_m, n_m, rs_m[0], rs_m[1], rs_m[2:])
+c_mp = rsa.encrypt(primes.encode("three primes"), e_m, n_m)
+check("RSA multi-prime CRT decrypt", primes.decode(key_mp.decrypt(c_mp)), "three primes")
+check("RSA multi-prime PKCS#1 DER roundtrip", rsa.rsa_private_from_pkcs1_der(key_mp.to_pkcs1_der()), (e_m, d_m, n_m, rs_m[0], rs_m[1], rs_m[2:]))
+check("RSA multi-prime PKCS#8 PEM roundtrip", rsa.RSAPrivateKey.from_pkcs8_pem(key_mp.to_pkcs8_pem()).decrypt(c_mp), key_mp.decrypt(c_mp))
+
+(key_b, sib_b) = rsa.generate_batch_keys(256, 5, False)
+es_b = [e_i for (e_i, _) in sib_b]
+check("RSA batch exponents are small distinct primes", (len(set(es_b)), all(primes.is_prime(e_i) and e_i < 100 for e_i in es_b)), (5, True))
+check("RSA batch siblings decrypt", [rsa.decrypt(rsa.encrypt(42, e_i, key_b.n), d_i, key_b.n) for (e_i, d_i) in sib_b], [42] * 5)
+ms_b = [primes.encode(w) for w in ["one", "two", "three", "four", "five"]]
+cs_b = [rsa.encrypt(m, e_i, key_b.n) for (m, e_i) in zip(ms_b, es_b)]
+check("RSA batch decrypt", rsa.BatchDecryptor(key_b, es_b).decrypt(cs_b), ms_b)
+check("RSA batch decrypt with a zero plaintext", rsa.BatchDecryptor(key_b, es_b[:2]).decrypt([0, cs_b[1]]), [0, ms_b[1]])
+for (label, attempt) in [("no exponents", lambda: rsa.BatchDecryptor(key_b, [])),
+                         ("duplicate exponents", lambda: rsa.BatchDecryptor(key_b, [es_b[0], es_b[0]])),
+                         ("too few ciphertexts", lambda: rsa.BatchDecryptor(key_b, es_b).decrypt(cs_b[:4]))]:
+    try:
+        attempt(); raised = False
+    except ValueError:
+        raised = True
+    check(f"RSA batch with {label} raises ValueError", raised, True)
+
 # ─── Non-RSA serialization ────────────────────────────────────────────────────
 print("\n=== non-RSA serialization ===")
 
@@ -200,6 +438,15 @@ check("SS pub PEM roundtrip",   ss.ss_public_from_pem(ss.ss_public_to_pem(en_ss)
 check("SS prv PEM roundtrip",   ss.ss_private_from_pem(ss.ss_private_to_pem(d_ss2, γ_ss2)), (d_ss2, γ_ss2))
 check("SS pub XML roundtrip",   ss.ss_public_from_xml(ss.ss_public_to_xml(en_ss)), en_ss)
 check("SS prv XML roundtrip",   ss.ss_private_from_xml(ss.ss_private_to_xml(d_ss2, γ_ss2)), (d_ss2, γ_ss2))
+key_ss = ss.SSPrivateKey.from_blob(ss.ss_private_to_blob(d_ss2, γ_ss2), en_ss)
+c_ss = ss.encrypt(primes.encode("CRT"), en_ss)
+check("SS CRT key from two-field blob", (key_ss.p * key_ss.q, key_ss.p * key_ss.γ), (γ_ss2, en_ss))
+check("SS CRT decrypt", primes.decode(key_ss.decrypt(c_ss)), "CRT")
+check("SS CRT key writes the two-field blob", key_ss.to_blob(), ss.ss_private_to_blob(d_ss2, γ_ss2))
+check("SS CRT blob roundtrip",  ss.ss_private_crt_from_blob(key_ss.to_crt_blob()), (d_ss2, γ_ss2, key_ss.p, key_ss.q))
+check("SS CRT PEM roundtrip",   ss.SSPrivateKey.from_crt_pem(key_ss.to_crt_pem()).decrypt(c_ss), key_ss.decrypt(c_ss))
+check("SS CRT XML roundtrip",   ss.ss_private_crt_from_xml(key_ss.to_crt_xml()), (d_ss2, γ_ss2, key_ss.p, key_ss.q))
+check("SS CRT key from bad PEM", ss.SSPrivateKey.from_crt_pem("junk"), None)
 
 # Cocks — reuse (en_c, de_c) from above
 (π_c, q_c) = de_c